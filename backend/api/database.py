@@ -1,14 +1,19 @@
 """Database connection and session management."""
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import AsyncGenerator
 
 from .config import settings
 
-# Create database engine
+# Synchronous engine, used by Celery workers and scripts
 engine = create_engine(
     settings.DATABASE_URL,
+    pool_size=settings.WORKER_DB_POOL_SIZE,
+    max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+    pool_recycle=settings.WORKER_DB_POOL_RECYCLE,
     pool_pre_ping=True,
     echo=False  # Set to True for SQL query logging
 )
@@ -16,18 +21,47 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Asynchronous engine (asyncpg), used by the API request handlers
+ASYNC_DATABASE_URL = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-def get_db() -> Generator[Session, None, None]:
+if settings.DB_USE_PGBOUNCER:
+    # PgBouncer (transaction pooling) owns the server connections, so keep no
+    # local pool and disable asyncpg's prepared statement cache, which is not
+    # valid across the pooled backends
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=NullPool,
+        connect_args={"statement_cache_size": 0},
+        echo=False
+    )
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        echo=False
+    )
+
+# Objects stay usable after commit so responses can be serialized without
+# triggering implicit (and, under asyncio, unsupported) lazy refreshes
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency function to get database session.
+    Dependency function to get an async database session.
 
     Usage:
         @router.get("/example")
-        def example(db: Session = Depends(get_db)):
-            # Use db here
+        async def example(db: AsyncSession = Depends(get_db)):
+            result = await db.execute(select(Project))
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
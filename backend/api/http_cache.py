@@ -0,0 +1,39 @@
+"""HTTP caching helpers for pre-encoded JSON responses."""
+
+import hashlib
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def make_etag(body: bytes) -> str:
+    """Build a strong ETag from an encoded response body."""
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header covers the ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cached_json_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    cache_control: str
+) -> Response:
+    """
+    Serve an already-encoded JSON body with cache validators.
+
+    Returns an empty 304 Not Modified when the client already holds the
+    current representation.
+    """
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,12 +1,19 @@
 """FastAPI main application."""
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from contextlib import asynccontextmanager
+import asyncio
 import logging
+import orjson
 
 from .config import settings
+from .database import async_engine
+from .http_cache import cached_json_response, make_etag
 from .routes import projects, analysis, auth, data
+from .services import data_service
 
 # Configure logging
 logging.basicConfig(
@@ -20,10 +27,16 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     logger.info("Starting up Solar Platform API...")
+    loop = asyncio.get_running_loop()
+    if type(loop).__module__.split(".")[0] != "uvloop":
+        logger.warning(f"Running on {type(loop).__name__}; start with --loop uvloop for production")
     # Initialize database connections, etc.
+    data_service.open_datasets()
     yield
     logger.info("Shutting down Solar Platform API...")
     # Cleanup
+    data_service.close_datasets()
+    await async_engine.dispose()
 
 
 # Create FastAPI application
@@ -32,6 +45,7 @@ app = FastAPI(
     description="RESTful API for solar site selection and analysis",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
@@ -45,6 +59,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON bodies above 1 KB (job lists, results, layer catalog);
+# level 5 keeps CPU cost low while still shrinking repetitive keys ~5-10x
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(projects.router, prefix="/projects", tags=["Projects"])
@@ -52,22 +70,52 @@ app.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
 app.include_router(data.router, prefix="/data", tags=["Data Query"])
 
 
+# Constant response bodies, encoded once at import time
+_ROOT_JSON = orjson.dumps({
+    "message": "Global Solar Energy Planning Platform API",
+    "version": "1.0.0",
+    "docs": "/docs",
+    "status": "operational"
+})
+
+# Health status is constant until real DB/queue checks are added; those
+# should then refresh a cached last-known-good body from a background task
+# rather than run on every probe
+_HEALTH_JSON = orjson.dumps({
+    "status": "healthy",
+    "database": "connected",  # TODO: Add actual DB check
+    "queue": "connected"  # TODO: Add actual queue check
+})
+_HEALTH_ETAG = make_etag(_HEALTH_JSON)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
-        "message": "Global Solar Energy Planning Platform API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "status": "operational"
-    }
+    return Response(content=_ROOT_JSON, media_type="application/json")
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "database": "connected",  # TODO: Add actual DB check
-        "queue": "connected"  # TODO: Add actual queue check
-    }
+    # no-cache: clients must revalidate each probe, but get a bodiless 304
+    return cached_json_response(
+        request,
+        _HEALTH_JSON,
+        _HEALTH_ETAG,
+        "no-cache"
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "api.main:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=settings.API_WORKERS,
+        loop="uvloop",
+        http="httptools",
+        access_log=settings.ACCESS_LOG
+    )
@@ -1,12 +1,15 @@
 """Analysis job API endpoints."""
 
-from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+import orjson
 
 from ..database import get_db
+from ..http_cache import cached_json_response, make_etag
 from ..schemas.analysis import (
     AnalysisJobCreate,
+    AnalysisJobBatchCreate,
     AnalysisJobResponse,
     JobStatusResponse,
     JobResultsResponse
@@ -26,7 +29,7 @@ async def run_analysis(
     aoi_id: int,
     job_data: AnalysisJobCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Start a new MCDA analysis job.
@@ -43,35 +46,71 @@ async def run_analysis(
     - weights_json: Dict of factor weights (e.g., {"ghi": 40, "slope": 25})
     - constraints_json: Dict of exclusion rules (e.g., {"slope_gt": 10})
     """
-    job = analysis_service.create_and_queue_job(
+    job = await analysis_service.create_and_queue_job(
         db, project_id, aoi_id, job_data
     )
     return job
 
 
-@router.get("/{job_id}/status", response_model=JobStatusResponse)
+@router.post(
+    "/{project_id}/run/batch",
+    response_model=list[AnalysisJobResponse],
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def run_analysis_batch(
+    project_id: int,
+    batch: AnalysisJobBatchCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start several MCDA analysis jobs in one request.
+
+    Each entry names its AOI and carries its own weights and constraints.
+    All jobs are recorded with status=PENDING and published to the queue
+    together; poll each job's /analysis/{job_id}/status as usual.
+    """
+    jobs = await analysis_service.create_and_queue_jobs_bulk(
+        db,
+        [(project_id, item.aoi_id, item) for item in batch.jobs]
+    )
+    return jobs
+
+
+@router.get(
+    "/{job_id}/status",
+    response_model=None,
+    responses={200: {"model": JobStatusResponse}}
+)
 async def get_job_status(
     job_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Poll the status of an analysis job.
 
     Returns current status: PENDING, RUNNING, COMPLETE, or FAILED.
+    Responses carry an ETag, so pollers sending If-None-Match get an empty
+    304 while the status is unchanged.
     """
-    status_info = analysis_service.get_job_status(db, job_id)
+    status_info = await analysis_service.get_job_status(db, job_id)
     if not status_info:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Job {job_id} not found"
         )
-    return status_info
+    body = orjson.dumps(status_info)
+    return cached_json_response(request, body, make_etag(body), "no-cache")
 
 
-@router.get("/{job_id}/results", response_model=JobResultsResponse)
+@router.get(
+    "/{job_id}/results",
+    response_model=None,
+    responses={200: {"model": JobResultsResponse}}
+)
 async def get_job_results(
     job_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get results for a completed analysis job.
@@ -84,36 +123,41 @@ async def get_job_results(
 
     Only available when job status is COMPLETE.
     """
-    results = analysis_service.get_job_results(db, job_id)
+    results = await analysis_service.get_job_results(db, job_id)
     if not results:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Job {job_id} not found or not yet complete"
         )
-    return results
+    # Already-encoded JSON from the database; skip response validation
+    return Response(content=results, media_type="application/json")
 
 
 @router.get("/{project_id}/jobs", response_model=list[AnalysisJobResponse])
 async def list_project_jobs(
     project_id: int,
-    db: Session = Depends(get_db)
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    List all analysis jobs for a project.
+    List analysis jobs for a project, newest first.
+
+    Supports pagination with skip and limit parameters.
     """
-    jobs = analysis_service.list_project_jobs(db, project_id)
+    jobs = await analysis_service.list_project_jobs(db, project_id, skip=skip, limit=limit)
     return jobs
 
 
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_or_delete_job(
     job_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Cancel a running job or delete a completed job.
     """
-    success = analysis_service.delete_job(db, job_id)
+    success = await analysis_service.delete_job(db, job_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
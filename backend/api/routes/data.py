@@ -1,14 +1,21 @@
 """Data query API endpoints (Parcel Inspector)."""
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import Dict
+import msgspec
+import orjson
 
+from ..http_cache import cached_json_response, make_etag
 from ..services import data_service
 
 router = APIRouter()
 
+# The layer catalog is static, so it is encoded once at import time
+_LAYERS_JSON = orjson.dumps(data_service.get_available_layers())
+_LAYERS_ETAG = make_etag(_LAYERS_JSON)
 
-@router.get("/point", response_model=Dict)
+
+@router.get("/point", response_model=None)
 async def query_point(
     lat: float = Query(..., ge=-90, le=90, description="Latitude in decimal degrees"),
     lon: float = Query(..., ge=-180, le=180, description="Longitude in decimal degrees")
@@ -48,7 +55,8 @@ async def query_point(
     """
     try:
         data = await data_service.query_point_data(lat, lon)
-        return data
+        # Encoded by msgspec from typed structs; FastAPI validation is skipped
+        return Response(content=msgspec.json.encode(data), media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -57,11 +65,16 @@ async def query_point(
 
 
 @router.get("/layers", response_model=Dict)
-async def list_available_layers():
+async def list_available_layers(request: Request):
     """
     List all available data layers with metadata.
 
     Returns information about resolution, source, and coverage for each layer.
+    The response is cacheable for an hour and honours If-None-Match.
     """
-    layers = data_service.get_available_layers()
-    return layers
+    return cached_json_response(
+        request,
+        _LAYERS_JSON,
+        _LAYERS_ETAG,
+        "public, max-age=3600"
+    )
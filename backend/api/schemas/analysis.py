@@ -1,11 +1,19 @@
 """Pydantic schemas for analysis job requests/responses."""
 
-from pydantic import BaseModel, Field
-from typing import Dict, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
+from typing_extensions import TypedDict
 from datetime import datetime
 from models.project import JobStatus
 
 
+class ConstraintRules(TypedDict, total=False):
+    """Binary constraint rules understood by the MCDA engine."""
+    slope_gt: float
+    lulc_exclude: List[int]
+    grid_dist_gt: float
+
+
 class AnalysisJobCreate(BaseModel):
     """Schema for creating a new analysis job."""
     weights_json: Dict[str, float] = Field(
@@ -13,7 +21,7 @@ class AnalysisJobCreate(BaseModel):
         description="Factor weights (must sum to 100)",
         example={"ghi": 40, "slope": 25, "grid_dist": 20, "road_dist": 15}
     )
-    constraints_json: Dict[str, any] = Field(
+    constraints_json: ConstraintRules = Field(
         ...,
         description="Binary constraint rules",
         example={
@@ -24,6 +32,16 @@ class AnalysisJobCreate(BaseModel):
     )
 
 
+class AnalysisJobBatchItem(AnalysisJobCreate):
+    """Schema for one job in a batch submission."""
+    aoi_id: int
+
+
+class AnalysisJobBatchCreate(BaseModel):
+    """Schema for submitting several analysis jobs at once."""
+    jobs: List[AnalysisJobBatchItem] = Field(..., min_length=1)
+
+
 class AnalysisJobResponse(BaseModel):
     """Schema for analysis job response."""
     id: int
@@ -37,8 +55,7 @@ class AnalysisJobResponse(BaseModel):
     completed_at: Optional[datetime]
     error_log: Optional[str]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class JobStatusResponse(BaseModel):
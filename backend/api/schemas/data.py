@@ -0,0 +1,43 @@
+"""msgspec structs for the Parcel Inspector point query response."""
+
+from typing import Optional
+import msgspec
+
+
+class Coordinates(msgspec.Struct):
+    """Queried location in decimal degrees."""
+    lat: float
+    lon: float
+
+
+class SolarValues(msgspec.Struct):
+    """Solar resource values at the point."""
+    ghi: Optional[float] = None
+    dni: Optional[float] = None
+
+
+class TerrainValues(msgspec.Struct):
+    """Terrain values at the point."""
+    elevation: Optional[float] = None
+    slope: Optional[float] = None
+
+
+class InfrastructureValues(msgspec.Struct):
+    """Distances to the nearest infrastructure."""
+    distance_to_grid_km: Optional[float] = None
+    distance_to_roads_km: Optional[float] = None
+
+
+class LandCoverValue(msgspec.Struct, omit_defaults=True):
+    """Land cover class at the point; empty when the pixel is nodata."""
+    code: Optional[int] = None
+    class_: Optional[str] = msgspec.field(default=None, name="class")
+
+
+class PointQueryResponse(msgspec.Struct):
+    """All data layer values sampled at one point."""
+    coordinates: Coordinates
+    solar: SolarValues = msgspec.field(default_factory=SolarValues)
+    terrain: TerrainValues = msgspec.field(default_factory=TerrainValues)
+    infrastructure: InfrastructureValues = msgspec.field(default_factory=InfrastructureValues)
+    land_cover: LandCoverValue = msgspec.field(default_factory=LandCoverValue)
@@ -1,93 +1,170 @@
 """Analysis service layer."""
 
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from math import fsum
+from typing import Optional, List, Tuple
 from datetime import datetime
+from celery import group
+from cachetools import TTLCache
 
 from models.project import AnalysisJob, JobStatus
 from api.schemas.analysis import AnalysisJobCreate
 from workers.tasks import run_mcda_analysis
 
+# COMPLETE/FAILED jobs never change again, so their status payloads are kept
+# in-process and repeat polls skip the database
+_TERMINAL_STATUSES: TTLCache = TTLCache(maxsize=100_000, ttl=600)
+
+
+async def create_and_queue_jobs_bulk(
+    db: AsyncSession,
+    specs: List[Tuple[int, int, AnalysisJobCreate]]
+) -> List[AnalysisJob]:
+    """
+    Create several analysis jobs and queue them for processing.
+
+    All jobs are inserted in one commit and published to the broker as a
+    single Celery group, reusing one pooled producer connection instead of
+    paying connection setup per job.
+
+    Args:
+        db: Database session
+        specs: List of (project_id, aoi_id, job parameters) tuples
+    """
+    # Validate weights sum to 100 (compensated sum, independent of key order)
+    for _, _, data in specs:
+        total_weight = fsum(data.weights_json.values())
+        if abs(total_weight - 100) > 0.01:
+            raise ValueError(f"Weights must sum to 100, got {total_weight}")
+
+    # Create job records
+    jobs = [
+        AnalysisJob(
+            project_id=project_id,
+            aoi_id=aoi_id,
+            status=JobStatus.PENDING,
+            weights_json=data.weights_json,
+            constraints_json=data.constraints_json
+        )
+        for project_id, aoi_id, data in specs
+    ]
+
+    db.add_all(jobs)
+    await db.commit()
+
+    # Reload server-generated columns (timestamps) for all jobs in one query
+    await db.execute(
+        select(AnalysisJob)
+        .where(AnalysisJob.id.in_([job.id for job in jobs]))
+        .execution_options(populate_existing=True)
+    )
+
+    # Queue the jobs for processing
+    # This sends the jobs to RabbitMQ, where Celery workers will pick them up
+    group(run_mcda_analysis.s(job.id) for job in jobs).apply_async()
+
+    return jobs
 
-def create_and_queue_job(
-    db: Session,
+
+async def create_and_queue_job(
+    db: AsyncSession,
     project_id: int,
     aoi_id: int,
     data: AnalysisJobCreate
 ) -> AnalysisJob:
     """Create a new analysis job and queue it for processing."""
+    jobs = await create_and_queue_jobs_bulk(db, [(project_id, aoi_id, data)])
+    return jobs[0]
 
-    # Validate weights sum to 100
-    total_weight = sum(data.weights_json.values())
-    if abs(total_weight - 100) > 0.01:
-        raise ValueError(f"Weights must sum to 100, got {total_weight}")
-
-    # Create job record
-    job = AnalysisJob(
-        project_id=project_id,
-        aoi_id=aoi_id,
-        status=JobStatus.PENDING,
-        weights_json=data.weights_json,
-        constraints_json=data.constraints_json
-    )
 
-    db.add(job)
-    db.commit()
-    db.refresh(job)
+async def _get_job(db: AsyncSession, job_id: int) -> Optional[AnalysisJob]:
+    """Get a job by ID."""
+    result = await db.execute(select(AnalysisJob).where(AnalysisJob.id == job_id))
+    return result.scalars().first()
 
-    # Queue the job for processing
-    # This sends the job to RabbitMQ, where a Celery worker will pick it up
-    run_mcda_analysis.delay(job.id)
 
-    return job
-
-
-def get_job_status(db: Session, job_id: int) -> Optional[dict]:
+async def get_job_status(db: AsyncSession, job_id: int) -> Optional[dict]:
     """Get the status of an analysis job."""
-    job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    cached = _TERMINAL_STATUSES.get(job_id)
+    if cached is not None:
+        return cached
+
+    job = await _get_job(db, job_id)
     if not job:
         return None
 
-    return {
+    status_info = {
         "job_id": job.id,
         "status": job.status,
         "progress_percent": None,  # TODO: Implement progress tracking
         "message": job.error_log if job.status == JobStatus.FAILED else None
     }
+    if job.status in (JobStatus.COMPLETE, JobStatus.FAILED):
+        _TERMINAL_STATUSES[job_id] = status_info
+    return status_info
+
+
+async def get_job_results(db: AsyncSession, job_id: int) -> Optional[str]:
+    """
+    Get results for a completed job as an encoded JSON document.
+
+    The document is built by PostgreSQL, so potentially large statistics
+    blobs go from the database to the response without being decoded into
+    Python objects and re-encoded.
+    """
+    result = await db.execute(
+        text("""
+            SELECT json_build_object(
+                'job_id', id,
+                'status', status,
+                'result_geotiff_url', result_url,
+                'result_tiles_url', result_tiles_url,
+                'statistics', stats_json,
+                'report_pdf_url', NULL  -- TODO: Implement PDF report generation
+            )::text
+            FROM analysis_jobs
+            WHERE id = :job_id AND status = :status
+        """),
+        {"job_id": job_id, "status": JobStatus.COMPLETE.value}
+    )
+    return result.scalar_one_or_none()
 
 
-def get_job_results(db: Session, job_id: int) -> Optional[dict]:
-    """Get results for a completed job."""
-    job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
-    if not job or job.status != JobStatus.COMPLETE:
-        return None
-
-    return {
-        "job_id": job.id,
-        "status": job.status,
-        "result_geotiff_url": job.result_url,
-        "result_tiles_url": job.result_tiles_url,
-        "statistics": job.stats_json,
-        "report_pdf_url": None  # TODO: Implement PDF report generation
-    }
-
-
-def list_project_jobs(db: Session, project_id: int) -> List[AnalysisJob]:
-    """List all jobs for a project."""
-    return db.query(AnalysisJob)\
-        .filter(AnalysisJob.project_id == project_id)\
-        .order_by(AnalysisJob.created_at.desc())\
-        .all()
+async def list_project_jobs(
+    db: AsyncSession,
+    project_id: int,
+    skip: int = 0,
+    limit: int = 100
+) -> List[AnalysisJob]:
+    """
+    List jobs for a project, newest first.
+
+    Relationships are never loaded per row: the list response only uses
+    column attributes, and raiseload turns any accidental N+1 into an error.
+    """
+    result = await db.execute(
+        select(AnalysisJob)
+        .options(raiseload("*"))
+        .where(AnalysisJob.project_id == project_id)
+        .order_by(AnalysisJob.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
 
 
-def delete_job(db: Session, job_id: int) -> bool:
+async def delete_job(db: AsyncSession, job_id: int) -> bool:
     """Delete a job."""
-    job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    job = await _get_job(db, job_id)
     if not job:
         return False
 
     # TODO: Cancel Celery task if running
 
-    db.delete(job)
-    db.commit()
+    await db.delete(job)
+    await db.commit()
+    _TERMINAL_STATUSES.pop(job_id, None)
     return True
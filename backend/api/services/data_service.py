@@ -1,10 +1,21 @@
 """Data query service layer (Parcel Inspector)."""
 
-from typing import Dict
+import asyncio
+import logging
+import math
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import rasterio
-from rasterio.transform import rowcol
-import boto3
+from rasterio.windows import Window
+from osgeo import gdal
 from api.config import settings
+from api.schemas.data import Coordinates, PointQueryResponse
+
+logger = logging.getLogger(__name__)
 
 
 # TODO: Load from database or config
@@ -35,68 +46,196 @@ LULC_CLASSES = {
 }
 
 
-async def query_point_data(lat: float, lon: float) -> Dict:
+# GDAL options for the long-lived stack handles: skip S3 directory listings on
+# open, keep fetched blocks in the VSI cache between requests, and reuse
+# HTTP/2 connections so concurrent range reads share a multiplexed socket.
+GDAL_ENV_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": ".tif",
+    "VSI_CACHE": "YES",
+    "VSI_CACHE_SIZE": str(settings.GDAL_CACHEMAX * 1024 * 1024),
+    "GDAL_HTTP_VERSION": "2",
+    "GDAL_HTTP_MULTIPLEX": "YES",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+}
+
+# Point-query fields: (category, field, catalog layer, scale applied to the value)
+POINT_QUERY_FIELDS = [
+    ("solar", "ghi", "ghi", 1.0),
+    ("solar", "dni", "dni", 1.0),
+    ("terrain", "elevation", "dem", 1.0),
+    ("terrain", "slope", "slope", 1.0),
+    ("infrastructure", "distance_to_grid_km", "distance_to_grid", 1 / 1000),
+    ("infrastructure", "distance_to_roads_km", "distance_to_roads", 1 / 1000),
+]
+
+# Band order of the point-query stack VRT (1-based band = index + 1)
+STACK_LAYERS = [key for _, _, key, _ in POINT_QUERY_FIELDS] + ["lulc"]
+
+# Multi-band VRT over all point-query layers, opened once on startup by
+# open_datasets(), with its inverse transform and per-band nodata values.
+_STACK: Optional[rasterio.io.DatasetReader] = None
+_STACK_PATH: Optional[str] = None
+_STACK_INV: Optional[Tuple[float, float, float, float, float, float]] = None
+_STACK_NODATA: Optional[np.ndarray] = None
+_STACK_SCALES: Optional[np.ndarray] = None
+_STACK_OFFSETS: Optional[np.ndarray] = None
+_STACK_DIR: Optional[tempfile.TemporaryDirectory] = None
+_POOL: Optional[ThreadPoolExecutor] = None
+
+# GDAL dataset handles are not thread-safe, so each sampling thread reads
+# through its own handle on the stack; all of them are closed on shutdown.
+_THREAD_LOCAL = threading.local()
+_THREAD_HANDLES: List[rasterio.io.DatasetReader] = []
+_THREAD_HANDLES_LOCK = threading.Lock()
+
+
+def _to_vsi_path(uri: str) -> str:
+    """Convert an s3:// URI to the GDAL /vsis3/ virtual path."""
+    return uri.replace("s3://", "/vsis3/", 1)
+
+
+def build_stack_vrt(output_path: str) -> None:
     """
-    Query all data layers at a specific point.
+    Build a band-separated VRT stacking every point-query layer.
 
-    Uses rasterio to sample COGs on S3 via HTTP range requests.
+    Bands follow STACK_LAYERS. The VRT grid uses the finest source resolution
+    so each band still resolves to its own native pixel.
     """
-    results = {
-        "coordinates": {"lat": lat, "lon": lon},
-        "solar": {},
-        "terrain": {},
-        "infrastructure": {},
-        "land_cover": {}
-    }
+    sources = [_to_vsi_path(DATA_LAYER_CATALOG[key]) for key in STACK_LAYERS]
+
+    with gdal.config_options(GDAL_ENV_OPTIONS):
+        vrt = gdal.BuildVRT(output_path, sources, separate=True, resolution="highest")
+        if vrt is None or vrt.RasterCount != len(sources):
+            raise RuntimeError(f"Stack VRT has missing bands, expected {len(sources)}")
+        vrt = None  # Flush VRT to disk
 
-    try:
-        # Sample GHI
-        with rasterio.open(DATA_LAYER_CATALOG["ghi"]) as src:
-            row, col = rowcol(src.transform, lon, lat)
-            value = src.read(1, window=((row, row+1), (col, col+1)))[0, 0]
-            results["solar"]["ghi"] = float(value) if value != src.nodata else None
-
-        # Sample DNI
-        with rasterio.open(DATA_LAYER_CATALOG["dni"]) as src:
-            row, col = rowcol(src.transform, lon, lat)
-            value = src.read(1, window=((row, row+1), (col, col+1)))[0, 0]
-            results["solar"]["dni"] = float(value) if value != src.nodata else None
-
-        # Sample DEM
-        with rasterio.open(DATA_LAYER_CATALOG["dem"]) as src:
-            row, col = rowcol(src.transform, lon, lat)
-            value = src.read(1, window=((row, row+1), (col, col+1)))[0, 0]
-            results["terrain"]["elevation"] = float(value) if value != src.nodata else None
-
-        # Sample Slope
-        with rasterio.open(DATA_LAYER_CATALOG["slope"]) as src:
-            row, col = rowcol(src.transform, lon, lat)
-            value = src.read(1, window=((row, row+1), (col, col+1)))[0, 0]
-            results["terrain"]["slope"] = float(value) if value != src.nodata else None
-
-        # Sample Distance to Grid
-        with rasterio.open(DATA_LAYER_CATALOG["distance_to_grid"]) as src:
-            row, col = rowcol(src.transform, lon, lat)
-            value = src.read(1, window=((row, row+1), (col, col+1)))[0, 0]
-            results["infrastructure"]["distance_to_grid_km"] = float(value) / 1000 if value != src.nodata else None
-
-        # Sample Distance to Roads
-        with rasterio.open(DATA_LAYER_CATALOG["distance_to_roads"]) as src:
-            row, col = rowcol(src.transform, lon, lat)
-            value = src.read(1, window=((row, row+1), (col, col+1)))[0, 0]
-            results["infrastructure"]["distance_to_roads_km"] = float(value) / 1000 if value != src.nodata else None
-
-        # Sample Land Cover
-        with rasterio.open(DATA_LAYER_CATALOG["lulc"]) as src:
-            row, col = rowcol(src.transform, lon, lat)
-            value = src.read(1, window=((row, row+1), (col, col+1)))[0, 0]
-            if value != src.nodata:
-                results["land_cover"]["code"] = int(value)
-                results["land_cover"]["class"] = LULC_CLASSES.get(int(value), "Unknown")
 
+def open_datasets() -> None:
+    """Build and open the point-query stack VRT and start the sampling pool."""
+    global _STACK, _STACK_PATH, _STACK_INV, _STACK_NODATA, _STACK_SCALES, _STACK_OFFSETS
+    global _STACK_DIR, _POOL
+
+    _STACK_DIR = tempfile.TemporaryDirectory(prefix="point-stack-")
+    stack_path = os.path.join(_STACK_DIR.name, "stack.vrt")
+
+    try:
+        build_stack_vrt(stack_path)
+        with rasterio.Env(**GDAL_ENV_OPTIONS):
+            _STACK = rasterio.open(stack_path)
+        _STACK_PATH = stack_path
+        _STACK_INV = tuple((~_STACK.transform)[:6])
+        _STACK_NODATA = np.array(
+            [nodata if nodata is not None else np.nan for nodata in _STACK.nodatas],
+            dtype=np.float64
+        )
+        # Quantized layers (e.g. slope, aspect) store value = raw * scale + offset
+        _STACK_SCALES = np.array(_STACK.scales, dtype=np.float64)
+        _STACK_OFFSETS = np.array(_STACK.offsets, dtype=np.float64)
+        logger.info(f"Opened point-query stack with {_STACK.count} layers")
     except Exception as e:
-        # Log error but return partial results
-        print(f"Error querying point data: {e}")
+        logger.warning(f"Could not open point-query stack: {e}")
+
+    _POOL = ThreadPoolExecutor(
+        max_workers=settings.NUM_WORKER_PROCESSES * 4,
+        thread_name_prefix="point-sample"
+    )
+
+
+def close_datasets() -> None:
+    """Shut down the sampling pool and close all stack VRT handles."""
+    global _STACK, _STACK_PATH, _STACK_INV, _STACK_NODATA, _STACK_SCALES, _STACK_OFFSETS
+    global _STACK_DIR, _POOL
+
+    if _POOL is not None:
+        _POOL.shutdown(wait=True)
+        _POOL = None
+
+    with _THREAD_HANDLES_LOCK:
+        for src in _THREAD_HANDLES:
+            src.close()
+        _THREAD_HANDLES.clear()
+
+    if _STACK is not None:
+        _STACK.close()
+    _STACK = _STACK_PATH = _STACK_INV = _STACK_NODATA = _STACK_SCALES = _STACK_OFFSETS = None
+
+    if _STACK_DIR is not None:
+        _STACK_DIR.cleanup()
+        _STACK_DIR = None
+
+
+def _world_to_rc(lon: float, lat: float, a: float, b: float, c: float,
+                 d: float, e: float, f: float) -> Tuple[int, int]:
+    """Apply inverse affine coefficients to a coordinate, returning (row, col)."""
+    return math.floor(d * lon + e * lat + f), math.floor(a * lon + b * lat + c)
+
+
+def _thread_stack() -> rasterio.io.DatasetReader:
+    """Return the calling thread's own handle on the stack VRT."""
+    src = getattr(_THREAD_LOCAL, "stack", None)
+    if src is None:
+        with rasterio.Env(**GDAL_ENV_OPTIONS):
+            src = rasterio.open(_STACK_PATH)
+        _THREAD_LOCAL.stack = src
+        with _THREAD_HANDLES_LOCK:
+            _THREAD_HANDLES.append(src)
+    return src
+
+
+def _sample(band: int, row: int, col: int) -> float:
+    """
+    Read one stack band at a pixel, returning NaN for nodata.
+
+    Band scale/offset are applied, so quantized layers return physical units.
+
+    Blocking; runs on the sampling pool so the bands' range reads overlap.
+    """
+    src = _thread_stack()
+    with rasterio.Env(**GDAL_ENV_OPTIONS):
+        value = float(src.read(band, window=Window(col, row, 1, 1))[0, 0])
+    if value == _STACK_NODATA[band - 1]:
+        return np.nan
+    return value * _STACK_SCALES[band - 1] + _STACK_OFFSETS[band - 1]
+
+
+async def query_point_data(lat: float, lon: float) -> PointQueryResponse:
+    """
+    Query all data layers at a specific point.
+
+    Reads every band of the stacked VRT opened at startup concurrently on the
+    sampling thread pool, so the per-layer HTTP range requests overlap and
+    the query costs roughly one round-trip instead of one per layer.
+    """
+    results = PointQueryResponse(coordinates=Coordinates(lat=lat, lon=lon))
+    values = np.full(len(STACK_LAYERS), np.nan)
+
+    if _STACK is not None:
+        row, col = _world_to_rc(lon, lat, *_STACK_INV)
+        if 0 <= row < _STACK.height and 0 <= col < _STACK.width:
+            loop = asyncio.get_running_loop()
+            samples = await asyncio.gather(
+                *[
+                    loop.run_in_executor(_POOL, _sample, band, row, col)
+                    for band in range(1, len(STACK_LAYERS) + 1)
+                ],
+                return_exceptions=True
+            )
+            for i, sample in enumerate(samples):
+                if isinstance(sample, Exception):
+                    # Log error but return partial results
+                    logger.error(f"Error querying {STACK_LAYERS[i]} at point: {sample}")
+                else:
+                    values[i] = sample
+
+    for (category, field, _, scale), value in zip(POINT_QUERY_FIELDS, values):
+        if not np.isnan(value):
+            setattr(getattr(results, category), field, float(value) * scale)
+
+    lulc = values[-1]
+    if not np.isnan(lulc):
+        results.land_cover.code = int(lulc)
+        results.land_cover.class_ = LULC_CLASSES.get(int(lulc), "Unknown")
 
     return results
 
@@ -1,16 +1,32 @@
 """Project service layer."""
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, cast, type_coerce
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
-from geoalchemy2.shape import from_shape, to_shape
-from shapely.geometry import shape
+from geoalchemy2 import Geography, Geometry
+from geoalchemy2.elements import WKBElement
+from cachetools import TTLCache
+import asyncio
 import json
+import shapely
+import weakref
 
 from models.project import Project, AreaOfInterest
 from api.schemas.project import ProjectCreate, ProjectUpdate, AOICreate
 
 
-def create_project(db: Session, user_id: int, data: ProjectCreate) -> Project:
+# Read-through cache for get_project, invalidated on writes. It is per
+# process; once the API runs several workers or hosts, move it to Redis
+# (SETEX with the same TTL) so writes invalidate every reader.
+_PROJECT_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+# Per-project locks to stop concurrent misses stampeding the database;
+# weak values drop a lock once no request holds it
+_PROJECT_LOCKS: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+async def create_project(db: AsyncSession, user_id: int, data: ProjectCreate) -> Project:
     """Create a new project."""
     project = Project(
         user_id=user_id,
@@ -18,87 +34,148 @@ def create_project(db: Session, user_id: int, data: ProjectCreate) -> Project:
         description=data.description
     )
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     return project
 
 
-def get_project(db: Session, project_id: int) -> Optional[Project]:
-    """Get a project by ID."""
-    return db.query(Project).filter(Project.id == project_id).first()
+async def _load_project(db: AsyncSession, project_id: int, with_children: bool = False) -> Optional[Project]:
+    """
+    Load a project by ID from the database.
+
+    With with_children, AOIs and jobs are loaded up front with one IN-query
+    each, for callers that touch them (e.g. the delete cascade), instead of a
+    lazy SELECT per access (which also cannot run on an AsyncSession).
+    """
+    query = select(Project).where(Project.id == project_id)
+    if with_children:
+        query = query.options(
+            selectinload(Project.areas_of_interest),
+            selectinload(Project.analysis_jobs)
+        )
+    result = await db.execute(query.execution_options(populate_existing=True))
+    return result.scalars().first()
+
+
+async def get_project(db: AsyncSession, project_id: int) -> Optional[Project]:
+    """
+    Get a project by ID for reading.
+
+    Served from a short-lived cache so dashboards polling the same project
+    do not hit the database on every request. Concurrent misses for the
+    same project share a single query.
+    """
+    project = _PROJECT_CACHE.get(project_id)
+    if project is not None:
+        return project
+
+    lock = _PROJECT_LOCKS.setdefault(project_id, asyncio.Lock())
+    async with lock:
+        project = _PROJECT_CACHE.get(project_id)
+        if project is None:
+            project = await _load_project(db, project_id)
+            if project is not None:
+                _PROJECT_CACHE[project_id] = project
+    return project
 
 
-def list_projects(db: Session, user_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Project]:
+async def list_projects(db: AsyncSession, user_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[Project]:
     """List projects, optionally filtered by user."""
-    query = db.query(Project)
+    query = select(Project)
     if user_id:
-        query = query.filter(Project.user_id == user_id)
-    return query.offset(skip).limit(limit).all()
-
-
-def update_project(db: Session, project_id: int, data: ProjectUpdate) -> Optional[Project]:
-    """Update a project."""
-    project = get_project(db, project_id)
-    if not project:
-        return None
-
-    if data.name is not None:
-        project.name = data.name
-    if data.description is not None:
-        project.description = data.description
-
-    db.commit()
-    db.refresh(project)
+        query = query.where(Project.user_id == user_id)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+async def update_project(db: AsyncSession, project_id: int, data: ProjectUpdate) -> Optional[Project]:
+    """
+    Update a project.
+
+    The cached entry is dropped after the commit, under the project's lock,
+    so a concurrent get_project cannot re-cache the pre-commit row.
+    """
+    lock = _PROJECT_LOCKS.setdefault(project_id, asyncio.Lock())
+    async with lock:
+        project = await _load_project(db, project_id)
+        if not project:
+            return None
+
+        if data.name is not None:
+            project.name = data.name
+        if data.description is not None:
+            project.description = data.description
+
+        await db.commit()
+        _PROJECT_CACHE.pop(project_id, None)
+    await db.refresh(project)
     return project
 
 
-def delete_project(db: Session, project_id: int) -> bool:
-    """Delete a project."""
-    project = get_project(db, project_id)
-    if not project:
-        return False
+async def delete_project(db: AsyncSession, project_id: int) -> bool:
+    """Delete a project, dropping its cached entry as update_project does."""
+    lock = _PROJECT_LOCKS.setdefault(project_id, asyncio.Lock())
+    async with lock:
+        project = await _load_project(db, project_id, with_children=True)
+        if not project:
+            return False
 
-    db.delete(project)
-    db.commit()
+        await db.delete(project)
+        await db.commit()
+        _PROJECT_CACHE.pop(project_id, None)
     return True
 
 
-def create_or_update_aoi(db: Session, project_id: int, data: AOICreate) -> AreaOfInterest:
-    """Create or update an Area of Interest."""
-    # Convert GeoJSON to Shapely geometry
-    geom = shape(data.geojson)
-
-    # Calculate area in km²
-    # Note: This is a simple approximation. For accurate area, use projected coordinates
-    area_km2 = geom.area * 111.32 * 111.32  # Rough conversion from degrees² to km²
-
-    # Check if AOI already exists for this project
-    existing_aoi = db.query(AreaOfInterest).filter(
-        AreaOfInterest.project_id == project_id,
-        AreaOfInterest.name == data.name
-    ).first()
-
-    if existing_aoi:
-        # Update existing
-        existing_aoi.geom = from_shape(geom, srid=4326)
-        existing_aoi.area_km2 = area_km2
-        db.commit()
-        db.refresh(existing_aoi)
-        return existing_aoi
-    else:
-        # Create new
-        aoi = AreaOfInterest(
-            project_id=project_id,
-            name=data.name,
-            geom=from_shape(geom, srid=4326),
-            area_km2=area_km2
-        )
-        db.add(aoi)
-        db.commit()
-        db.refresh(aoi)
-        return aoi
+def _parse_aoi_geometry(geojson: dict) -> WKBElement:
+    """
+    Convert an AOI GeoJSON geometry to a WGS84 WKB element.
+
+    Uses shapely's C GeoJSON reader and WKB writer rather than building the
+    geometry coordinate by coordinate in Python.
+    """
+    geom = shapely.from_geojson(json.dumps(geojson))
+    return WKBElement(shapely.to_wkb(geom, output_dimension=2), srid=4326)
 
 
-def get_project_aois(db: Session, project_id: int) -> List[AreaOfInterest]:
+async def create_or_update_aoi(db: AsyncSession, project_id: int, data: AOICreate) -> AreaOfInterest:
+    """Create or update an Area of Interest."""
+    # Parsing and WKB encoding large polygons is CPU-bound, so keep it off
+    # the event loop
+    geom = await asyncio.to_thread(_parse_aoi_geometry, data.geojson)
+
+    # Geodesic area in km², computed by PostGIS on the spheroid
+    area_km2 = func.ST_Area(
+        cast(type_coerce(geom, Geometry(geometry_type="POLYGON", srid=4326)), Geography)
+    ) / 1e6
+
+    # Insert, or replace the geometry of the AOI with the same name, in one
+    # round-trip; the database resolves concurrent writers. RETURNING hands
+    # back the server-computed area.
+    stmt = insert(AreaOfInterest).values(
+        project_id=project_id,
+        name=data.name,
+        geom=geom,
+        area_km2=area_km2
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AreaOfInterest.project_id, AreaOfInterest.name],
+        set_={
+            "geom": stmt.excluded.geom,
+            "area_km2": stmt.excluded.area_km2,
+            "updated_at": func.now()
+        }
+    ).returning(AreaOfInterest)
+
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    aoi = result.scalar_one()
+    await db.commit()
+    _PROJECT_CACHE.pop(project_id, None)
+    return aoi
+
+
+async def get_project_aois(db: AsyncSession, project_id: int) -> List[AreaOfInterest]:
     """Get all AOIs for a project."""
-    return db.query(AreaOfInterest).filter(AreaOfInterest.project_id == project_id).all()
+    result = await db.execute(
+        select(AreaOfInterest).where(AreaOfInterest.project_id == project_id)
+    )
+    return result.scalars().all()
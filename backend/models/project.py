@@ -2,7 +2,7 @@
 
 from enum import Enum
 from typing import Optional
-from sqlalchemy import String, Integer, ForeignKey, JSON, Text, Enum as SQLEnum, Float
+from sqlalchemy import String, Integer, ForeignKey, JSON, Text, Enum as SQLEnum, Float, UniqueConstraint, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from geoalchemy2 import Geometry
 from .base import Base, TimestampMixin
@@ -20,6 +20,10 @@ class Project(Base, TimestampMixin):
     """Project model representing a solar analysis project."""
 
     __tablename__ = "projects"
+    __table_args__ = (
+        # Serves list_projects filtered by owner
+        Index("ix_projects_user_id", "user_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -47,6 +51,10 @@ class AreaOfInterest(Base, TimestampMixin):
     """Area of Interest (AOI) model - user-defined polygon."""
 
     __tablename__ = "areas_of_interest"
+    __table_args__ = (
+        # AOIs are addressed by name within a project (upsert conflict target)
+        UniqueConstraint("project_id", "name", name="uq_areas_of_interest_project_name"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
@@ -63,6 +71,7 @@ class AreaOfInterest(Base, TimestampMixin):
 
     # Relationships
     project: Mapped["Project"] = relationship("Project", back_populates="areas_of_interest")
+    analysis_jobs: Mapped[list["AnalysisJob"]] = relationship("AnalysisJob", back_populates="aoi")
 
     def __repr__(self) -> str:
         return f"<AreaOfInterest(id={self.id}, name='{self.name}', area_km2={self.area_km2})>"
@@ -72,14 +81,34 @@ class AnalysisJob(Base, TimestampMixin):
     """Analysis job model tracking MCDA processing."""
 
     __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        # Serves list_project_jobs (project filter + newest first) as an ordered range scan
+        Index("ix_analysis_jobs_project_created", "project_id", text("created_at DESC")),
+        # Partial index over active jobs only: stays small as job history grows
+        # and serves worker/dashboard scans for PENDING and RUNNING jobs
+        Index(
+            "ix_analysis_jobs_status_active",
+            "status",
+            "created_at",
+            postgresql_where=text("status IN ('PENDING', 'RUNNING')")
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
     aoi_id: Mapped[int] = mapped_column(ForeignKey("areas_of_interest.id"), nullable=False)
 
     # Job status
+    # Stored as the native PostgreSQL enum type "jobstatus" (4-byte values,
+    # compact index entries); labels are the enum values
     status: Mapped[JobStatus] = mapped_column(
-        SQLEnum(JobStatus),
+        SQLEnum(
+            JobStatus,
+            name="jobstatus",
+            native_enum=True,
+            create_constraint=False,
+            values_callable=lambda enum_cls: [member.value for member in enum_cls]
+        ),
         default=JobStatus.PENDING,
         nullable=False
     )
@@ -109,6 +138,7 @@ class AnalysisJob(Base, TimestampMixin):
 
     # Relationships
     project: Mapped["Project"] = relationship("Project", back_populates="analysis_jobs")
+    aoi: Mapped["AreaOfInterest"] = relationship("AreaOfInterest", back_populates="analysis_jobs")
 
     def __repr__(self) -> str:
         return f"<AnalysisJob(id={self.id}, status={self.status})>"
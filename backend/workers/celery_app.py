@@ -15,11 +15,22 @@ celery_app = Celery(
 celery_app.conf.update(
     task_soft_time_limit=settings.CELERY_TASK_SOFT_TIME_LIMIT,
     task_time_limit=settings.CELERY_TASK_TIME_LIMIT,
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    # Binary msgpack payloads: task arguments are plain job IDs
+    task_serializer="msgpack",
+    accept_content=["msgpack"],
+    result_serializer="msgpack",
+    # Tasks record their outcome on the AnalysisJob row; nothing reads
+    # Celery results, so don't store them
+    task_ignore_result=True,
+    result_expires=3600,
     timezone="UTC",
     enable_utc=True,
-    worker_prefetch_multiplier=1,
+    # Broker QoS: bound how many messages each worker holds unacknowledged.
+    # Acking late returns a job to the queue if its worker dies mid-run.
+    # To run lightweight tasks with a much larger prefetch (e.g. 100), route
+    # them to their own queue via task_routes and start a dedicated worker
+    # with `-Q <queue> --prefetch-multiplier 100`.
+    worker_prefetch_multiplier=settings.CELERY_WORKER_PREFETCH_MULTIPLIER,
+    task_acks_late=True,
     worker_max_tasks_per_child=50,
 )
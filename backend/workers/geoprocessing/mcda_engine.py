@@ -5,21 +5,33 @@ This module implements the "weighted overlay" analysis workflow described in Par
 of the strategic blueprint.
 """
 
+import math
 import os
 import tempfile
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterator, Optional, Tuple
 import numpy as np
 import rasterio
-import rasterio.mask
-from rasterio.transform import from_bounds
-from rasterio.warp import reproject, Resampling
-import richdem as rd
+import rasterio.shutil
+from rasterio.features import geometry_mask
+from rasterio.vrt import WarpedVRT
+from rasterio.windows import Window
+from rasterio.windows import bounds as window_bounds
+from rasterio.windows import transform as window_transform
+from rasterio.warp import Resampling
+from cachetools import LRUCache
 from geoalchemy2.shape import to_shape
+from shapely.geometry import box, mapping
+from shapely.prepared import prep
 from sqlalchemy.orm import Session
 import boto3
+from boto3.s3.transfer import TransferConfig
 
 from models.project import AnalysisJob, AreaOfInterest
 from api.config import settings
+from workers.geoprocessing.mcda_kernels import FACTORS, compute_stats, horn_slope, make_overlay_kernel
+from workers.geoprocessing.mcda_gpu import gpu_available, weighted_overlay_gpu
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,92 +47,362 @@ DATA_LAYER_CATALOG = {
     "lulc": f"s3://{settings.S3_DATA_LAKE_BUCKET}/lulc.tif",
 }
 
+# Reference layer: its pixel grid over the AOI bounds defines the analysis grid
+REFERENCE_LAYER = "ghi"
 
-def normalize_array(arr: np.ndarray, min_val: float, max_val: float, invert: bool = False) -> np.ndarray:
+# Layers read (warped onto the reference grid) for every job
+MCDA_LAYERS = ("ghi", "dem", "distance_to_grid", "distance_to_roads", "lulc")
+
+# Jobs are processed in square blocks of this size, so memory use is bounded
+# by the block rather than the AOI
+BLOCK_SIZE = 512
+
+# Creation options for the published result (GDAL COG driver, with overviews)
+COG_OPTIONS = {
+    "COMPRESS": "ZSTD",
+    "BLOCKSIZE": BLOCK_SIZE,
+    "OVERVIEWS": "AUTO",
+    "BIGTIFF": "IF_SAFER",
+    "NUM_THREADS": "ALL_CPUS",
+}
+
+# Categorical layers must not be interpolated when resampled
+LAYER_RESAMPLING = {"lulc": Resampling.nearest}
+
+# GDAL warper settings for the aligned reads
+WARP_MEM_LIMIT_MB = 1024
+WARP_THREADS = max((os.cpu_count() or 2) - 1, 1)
+
+# Multipart upload settings for results: 16 MB parts sent in parallel
+RESULT_UPLOAD_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# Approximate metres per degree, for slope on geographic (EPSG:4326) grids
+METERS_PER_DEGREE_LAT = 110_574.0
+METERS_PER_DEGREE_LON = 111_320.0
+
+# GDAL options for COG range reads: skip S3 directory listings, let libcurl
+# multiplex and merge range requests, and cache fetched blocks
+GDAL_ENV_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": ".tif",
+    "GDAL_HTTP_MULTIPLEX": "YES",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+    "VSI_CACHE": "TRUE",
+    # Decode compressed blocks on all cores and keep decoded blocks and
+    # fetched byte ranges cached across the block loop
+    "GDAL_NUM_THREADS": "ALL_CPUS",
+    "GDAL_CACHEMAX": settings.GDAL_CACHEMAX,
+    "VSI_CURL_CACHE_SIZE": 256 * 1024 * 1024,
+}
+
+# Normalization range per weighted factor: (min, max, invert)
+# Inverted factors score higher for lower values (e.g., slope, distance)
+FACTOR_RANGES = {
+    "ghi": (1000, 2500, False),
+    "slope": (0, 10, True),
+    "grid_dist": (0, 10000, True),
+    "road_dist": (0, 5000, True),
+}
+
+
+@contextmanager
+def open_aligned_vrt(
+    s3_path: str,
+    ref_profile: Dict,
+    resampling: Resampling = Resampling.bilinear
+) -> Iterator[WarpedVRT]:
     """
-    Normalize a NumPy array to a 0-100 scale.
+    Open a raster warped onto a reference grid.
+
+    GDAL resamples the source into exactly the reference CRS, transform and
+    shape using multiple warper threads, so every layer read through it is
+    pixel-aligned with the reference.
 
     Args:
-        arr: Input array
-        min_val: Minimum value for clipping
-        max_val: Maximum value for clipping
-        invert: If True, lower values are better (e.g., for slope, distance)
+        s3_path: S3 path to source COG
+        ref_profile: Profile with crs, transform, width and height of the reference grid
+        resampling: Resampling method
 
-    Returns:
-        Normalized array (0-100 scale)
+    Yields:
+        WarpedVRT over the source
     """
-    # Replace nodata with NaN for proper handling
-    arr = arr.astype(float)
+    with rasterio.open(s3_path) as src, WarpedVRT(
+        src,
+        crs=ref_profile["crs"],
+        transform=ref_profile["transform"],
+        width=ref_profile["width"],
+        height=ref_profile["height"],
+        resampling=resampling,
+        warp_mem_limit=WARP_MEM_LIMIT_MB,
+        num_threads=WARP_THREADS
+    ) as vrt:
+        yield vrt
 
-    # Clip to range
-    arr = np.clip(arr, min_val, max_val)
 
-    # Normalize to 0-1
-    norm_arr = (arr - min_val) / (max_val - min_val)
+# Parsed AOI geometries keyed by (aoi id, updated_at); reruns on the same
+# AOI skip the WKB parse
+_AOI_CACHE: LRUCache = LRUCache(maxsize=64)
 
-    # Invert if needed (for "lower is better" factors)
-    if invert:
-        norm_arr = 1 - norm_arr
+_s3_client = None
 
-    # Scale to 0-100
-    return norm_arr * 100
 
+def get_s3_client():
+    """
+    Get the process-wide S3 client.
 
-def clip_raster_to_aoi(s3_path: str, aoi_geom, output_path: str = None) -> tuple:
+    Created lazily so each (forked) worker process builds its own client
+    once and reuses its credentials and TLS connections across tasks.
     """
-    Clip a global COG raster to an AOI using HTTP range requests.
+    global _s3_client
+    if _s3_client is None:
+        _s3_client = boto3.client(
+            "s3",
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION
+        )
+    return _s3_client
+
+
+def load_aoi_geometry(aoi: AreaOfInterest) -> Tuple[Dict, Tuple[float, float, float, float], object]:
+    """
+    Get an AOI's geometry as a GeoJSON-like mapping plus its bounds.
+
+    The mapping is what rasterio's rasterizer consumes, so it is built once
+    per AOI version instead of converting the shapely geometry for every
+    block and layer. The prepared geometry answers block-vs-AOI
+    intersects/contains tests without re-indexing the polygon each time.
 
     Args:
-        s3_path: S3 path to source COG
-        aoi_geom: Shapely geometry for the AOI
-        output_path: Optional path to save clipped raster
+        aoi: AreaOfInterest instance
+
+    Returns:
+        Tuple of (geometry mapping, (minx, miny, maxx, maxy), prepared geometry)
+    """
+    key = (aoi.id, aoi.updated_at)
+    cached = _AOI_CACHE.get(key)
+    if cached is None:
+        aoi_geom = to_shape(aoi.geom)
+        cached = (mapping(aoi_geom), aoi_geom.bounds, prep(aoi_geom))
+        _AOI_CACHE[key] = cached
+    return cached
+
+
+def aoi_grid(s3_path: str, aoi_bounds: Tuple[float, float, float, float]) -> Dict:
+    """
+    Compute the analysis grid covering an AOI on a raster's native pixels.
+
+    Args:
+        s3_path: S3 path to the reference COG
+        aoi_bounds: AOI bounds as (minx, miny, maxx, maxy)
 
     Returns:
-        Tuple of (data array, transform, metadata)
+        Profile dict with crs, transform, width and height of the grid
     """
     with rasterio.open(s3_path) as src:
-        # Clip to AOI geometry
-        out_image, out_transform = rasterio.mask.mask(
-            src,
-            [aoi_geom],
-            crop=True,
-            nodata=src.nodata
+        window = (
+            src.window(*aoi_bounds)
+            .round_offsets(op="floor")
+            .round_lengths(op="ceil")
+            .intersection(Window(0, 0, src.width, src.height))
         )
+        return {
+            "crs": src.crs,
+            "transform": src.window_transform(window),
+            "width": int(window.width),
+            "height": int(window.height),
+        }
+
 
-        out_meta = src.meta.copy()
-        out_meta.update({
-            "driver": "GTiff",
-            "height": out_image.shape[1],
-            "width": out_image.shape[2],
-            "transform": out_transform,
-        })
+def _block_buffer(buffers: Dict, shape: Tuple[int, int], dtype) -> np.ndarray:
+    """Get a reusable array for one block shape (only edge blocks differ)."""
+    buffer = buffers.get(shape)
+    if buffer is None:
+        buffer = buffers[shape] = np.empty(shape, dtype=dtype)
+    return buffer
 
-        if output_path:
-            with rasterio.open(output_path, "w", **out_meta) as dest:
-                dest.write(out_image)
 
-    return out_image[0], out_transform, out_meta
+def _fill_value(vrt: WarpedVRT):
+    """Value written to pixels outside the AOI."""
+    return vrt.nodata if vrt.nodata is not None else 0
 
 
-def calculate_slope_from_dem(dem_array: np.ndarray, transform, nodata=-9999) -> np.ndarray:
+def read_aoi_window(
+    vrt: WarpedVRT,
+    window: Window,
+    aoi_shape: Dict,
+    halo: int = 0,
+    buffers: Optional[Dict] = None,
+    inside_aoi: bool = False,
+    outside_aoi: Optional[np.ndarray] = None
+) -> np.ndarray:
     """
-    Calculate slope in degrees from DEM using RichDEM.
+    Read a window of an aligned layer, with nodata outside the AOI.
+
+    Args:
+        vrt: Layer warped onto the analysis grid
+        window: Block window on the analysis grid
+        aoi_shape: AOI geometry as a GeoJSON-like mapping
+        halo: Extra pixels read on each side for neighbourhood operators;
+            edge values are repeated beyond the grid
+        buffers: Optional per-layer dict of reusable read buffers; the
+            returned array is then only valid until the next read
+        inside_aoi: The window, including its halo, lies entirely inside
+            the AOI, so no mask is rasterized
+        outside_aoi: Optional precomputed outside-AOI mask of the block
+            window, used instead of rasterizing when there is no halo
+
+    Returns:
+        Array of shape (height + 2 * halo, width + 2 * halo)
+    """
+    row_start = max(window.row_off - halo, 0)
+    col_start = max(window.col_off - halo, 0)
+    row_stop = min(window.row_off + window.height + halo, vrt.height)
+    col_stop = min(window.col_off + window.width + halo, vrt.width)
+    read_window = Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+    out = None
+    if buffers is not None:
+        out = _block_buffer(buffers, (read_window.height, read_window.width), vrt.dtypes[0])
+
+    # Runs on reader threads, and rasterio's Env is thread-local
+    with rasterio.Env(**GDAL_ENV_OPTIONS):
+        data = vrt.read(1, window=read_window, out=out)
+
+    if not inside_aoi:
+        if outside_aoi is None or halo:
+            outside_aoi = geometry_mask(
+                [aoi_shape],
+                out_shape=data.shape,
+                transform=vrt.window_transform(read_window)
+            )
+        data[outside_aoi] = _fill_value(vrt)
+
+    if halo:
+        pad_top = halo - (window.row_off - row_start)
+        pad_left = halo - (window.col_off - col_start)
+        pad_bottom = halo - (row_stop - window.row_off - window.height)
+        pad_right = halo - (col_stop - window.col_off - window.width)
+        data = np.pad(data, ((pad_top, pad_bottom), (pad_left, pad_right)), mode="edge")
+
+    return data
+
+
+def _update_running_stats(stats: Dict, block_stats: tuple) -> None:
+    """
+    Fold one block's statistics into the running job statistics.
+
+    Combines per-block (count, mean, M2) with Chan et al.'s pairwise form of
+    Welford's update, so mean and standard deviation are exact without
+    keeping the whole result in memory.
 
     Args:
-        dem_array: DEM array
-        transform: Raster transform
+        stats: Running dict with count, mean, m2, min and max
+        block_stats: (count, min, max, mean, M2) tuple from compute_stats
+    """
+    n_block, min_block, max_block, mean_block, m2_block = block_stats
+    if n_block == 0:
+        return
+
+    n_total = stats["count"] + n_block
+    delta = mean_block - stats["mean"]
+    stats["mean"] += delta * n_block / n_total
+    stats["m2"] += m2_block + delta * delta * stats["count"] * n_block / n_total
+    stats["count"] = n_total
+    stats["min"] = min(stats["min"], float(min_block))
+    stats["max"] = max(stats["max"], float(max_block))
+
+
+def build_overlay_params(weights: Dict) -> np.ndarray:
+    """
+    Build the factor parameter table for the weighted overlay kernel.
+
+    Args:
+        weights: Factor weights in percent (e.g., {"ghi": 40, "slope": 25})
+
+    Returns:
+        (4, 4) float32 array of (min, max, invert, weight fraction) rows in FACTORS order;
+        factors without a weight get a zero weight and are skipped
+    """
+    params = np.zeros((len(FACTORS), 4), dtype=np.float32)
+    for i, name in enumerate(FACTORS):
+        min_val, max_val, invert = FACTOR_RANGES[name]
+        params[i] = (min_val, max_val, float(invert), weights.get(name, 0) / 100.0)
+    return params
+
+
+def build_lulc_lut(codes) -> np.ndarray:
+    """
+    Build a lookup table of excluded land cover codes.
+
+    Args:
+        codes: Excluded land cover class codes (e.g., [50, 80])
+
+    Returns:
+        Bool array indexed by class code (at least 256 entries, so any
+        uint8 code is in range), True where the class is excluded
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    codes = codes[codes >= 0]
+    size = max(256, int(codes.max()) + 1) if codes.size else 256
+    lut = np.zeros(size, dtype=np.bool_)
+    lut[codes] = True
+    return lut
+
+
+def get_overlay_kernel(weights: Dict):
+    """
+    Get the CPU overlay kernel specialized for a job's weighted factors.
+
+    Args:
+        weights: Factor weights in percent
+
+    Returns:
+        Compiled kernel from make_overlay_kernel (cached per factor recipe)
+    """
+    factors = tuple(name for name in FACTORS if weights.get(name, 0))
+    return make_overlay_kernel(factors, tuple(FACTOR_RANGES[name][2] for name in factors))
+
+
+def calculate_slope_from_dem(
+    dem_array: np.ndarray,
+    transform,
+    nodata=-9999,
+    crs=None,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Calculate slope in degrees from DEM using Horn's method.
+
+    Args:
+        dem_array: DEM array with a 1-pixel halo around the output block
+        transform: Transform of the output block (without the halo)
         nodata: NoData value
+        crs: Raster CRS; pixel sizes of geographic grids are converted to
+            metres with the cosine of each row's latitude
+        out: Optional float32 array to write the slope into
 
     Returns:
-        Slope array in degrees
+        Slope array in degrees, two pixels smaller than the input in each dimension
     """
-    # Create RichDEM array
-    dem_rd = rd.rdarray(dem_array, no_data=nodata)
+    rows, cols = dem_array.shape[0] - 2, dem_array.shape[1] - 2
+    px, py = abs(transform.a), abs(transform.e)
 
-    # Calculate slope in degrees
-    slope = rd.TerrainAttribute(dem_rd, attrib='slope_degrees')
+    if crs is not None and crs.is_geographic:
+        row_lat = transform.f + transform.e * (np.arange(rows) + 0.5)
+        px_rows = px * METERS_PER_DEGREE_LON * np.cos(np.radians(row_lat))
+        py *= METERS_PER_DEGREE_LAT
+    else:
+        px_rows = np.full(rows, px)
 
-    return np.array(slope)
+    slope = out if out is not None else np.empty((rows, cols), dtype=np.float32)
+    horn_slope(dem_array, px_rows, float(py), float(nodata), slope)
+    return slope
 
 
 def process_mcda_job(db: Session, job: AnalysisJob) -> Dict:
@@ -141,153 +423,218 @@ def process_mcda_job(db: Session, job: AnalysisJob) -> Dict:
 
     Args:
         db: Database session
-        job: AnalysisJob instance
+        job: AnalysisJob instance with its AOI loaded
 
     Returns:
         Dictionary with result URLs and statistics
     """
-    logger.info(f"Processing MCDA job {job.id}")
+    logger.info("Processing MCDA job %d", job.id)
 
     # 1. Load AOI geometry
-    aoi = db.query(AreaOfInterest).filter(AreaOfInterest.id == job.aoi_id).first()
+    # The AOI is expected to be eager-loaded with the job (see run_mcda_analysis)
+    aoi = job.aoi
     if not aoi:
         raise ValueError(f"AOI {job.aoi_id} not found")
 
-    aoi_geom = to_shape(aoi.geom)
-    logger.info(f"AOI area: {aoi.area_km2:.2f} km²")
+    aoi_shape, aoi_bounds, aoi_prepared = load_aoi_geometry(aoi)
+    logger.info("AOI area: %.2f km²", aoi.area_km2)
 
     # Create temporary working directory
     with tempfile.TemporaryDirectory() as tmpdir:
 
-        # 2. Clip source rasters to AOI
-        logger.info("Clipping source rasters...")
-
-        ghi_data, transform, meta = clip_raster_to_aoi(
-            DATA_LAYER_CATALOG["ghi"],
-            aoi_geom
-        )
-
-        dem_data, _, _ = clip_raster_to_aoi(
-            DATA_LAYER_CATALOG["dem"],
-            aoi_geom
-        )
-
-        grid_dist_data, _, _ = clip_raster_to_aoi(
-            DATA_LAYER_CATALOG["distance_to_grid"],
-            aoi_geom
-        )
-
-        road_dist_data, _, _ = clip_raster_to_aoi(
-            DATA_LAYER_CATALOG["distance_to_roads"],
-            aoi_geom
-        )
-
-        lulc_data, _, _ = clip_raster_to_aoi(
-            DATA_LAYER_CATALOG["lulc"],
-            aoi_geom
-        )
-
-        # 3. Calculate on-the-fly derivatives
-        logger.info("Calculating slope from DEM...")
-        slope_data = calculate_slope_from_dem(dem_data, transform)
-
-        # 4. Create constraint mask (binary exclusion)
-        logger.info("Creating constraint mask...")
+        # 2. Open source rasters aligned to the AOI grid
+        # The GHI pixel grid over the AOI bounds is the analysis grid; the
+        # other layers are warped onto it so they are pixel-aligned by construction
+        logger.info("Opening source rasters...")
         constraints = job.constraints_json
-        constraint_mask = np.zeros(ghi_data.shape, dtype=bool)
-
-        # Exclude slopes greater than threshold
-        if "slope_gt" in constraints:
-            constraint_mask |= (slope_data > constraints["slope_gt"])
-            logger.info(f"Excluded {np.sum(slope_data > constraints['slope_gt'])} pixels due to slope")
-
-        # Exclude specific land cover classes
-        if "lulc_exclude" in constraints:
-            constraint_mask |= np.isin(lulc_data, constraints["lulc_exclude"])
-            logger.info(f"Excluded {np.sum(np.isin(lulc_data, constraints['lulc_exclude']))} pixels due to land cover")
-
-        # Exclude areas too far from grid
-        if "grid_dist_gt" in constraints:
-            constraint_mask |= (grid_dist_data > constraints["grid_dist_gt"])
-
-        # 5. Normalize factors to 0-100 scale
-        logger.info("Normalizing factors...")
         weights = job.weights_json
+        nodata_val = -9999
 
-        normalized_layers = {}
-
-        if "ghi" in weights:
-            normalized_layers["ghi"] = normalize_array(ghi_data, 1000, 2500, invert=False)
-
-        if "slope" in weights:
-            normalized_layers["slope"] = normalize_array(slope_data, 0, 10, invert=True)
-
-        if "grid_dist" in weights:
-            normalized_layers["grid_dist"] = normalize_array(grid_dist_data, 0, 10000, invert=True)
-
-        if "road_dist" in weights:
-            normalized_layers["road_dist"] = normalize_array(road_dist_data, 0, 5000, invert=True)
-
-        # 6. Run weighted overlay (MCDA)
-        logger.info("Running weighted overlay...")
-        final_map = np.zeros(ghi_data.shape, dtype=np.float32)
+        logger.info(
+            "Applying weights (%%): %s",
+            {name: weight for name, weight in weights.items() if name in FACTOR_RANGES}
+        )
 
-        for layer_name, weight in weights.items():
-            if layer_name in normalized_layers:
-                final_map += normalized_layers[layer_name] * (weight / 100.0)
-                logger.info(f"Applied weight {weight}% to {layer_name}")
+        overlay_params = build_overlay_params(weights)
+        slope_gt = np.float32(constraints.get("slope_gt", np.inf))
+        grid_dist_gt = np.float32(constraints.get("grid_dist_gt", np.inf))
+        lulc_lut = build_lulc_lut(constraints.get("lulc_exclude", []))
 
-        # 7. Apply constraints
-        nodata_val = -9999
-        final_map[constraint_mask] = nodata_val
-        logger.info(f"Applied constraints, excluded {np.sum(constraint_mask)} pixels")
+        # Same fused overlay on the GPU for workers configured for it
+        overlay = weighted_overlay_gpu if gpu_available() else get_overlay_kernel(weights)
+        logger.info("Weighted overlay device: %s", "GPU" if overlay is weighted_overlay_gpu else "CPU")
 
-        # 8. Save result to S3
-        logger.info("Saving result to S3...")
         result_filename = f"mcda_result_{job.id}.tif"
+        blocks_path = os.path.join(tmpdir, f"blocks_{result_filename}")
         result_path = os.path.join(tmpdir, result_filename)
 
-        # Update metadata for output
-        meta.update({
-            "dtype": "float32",
-            "nodata": nodata_val,
-            "compress": "lzw"
-        })
+        n_slope = n_lulc = n_grid = n_excluded = 0
+        running = {"count": 0, "mean": 0.0, "m2": 0.0, "min": math.inf, "max": -math.inf}
+
+        # Block arrays are allocated once per layer and block shape and
+        # reused, instead of once per layer per block
+        layer_buffers = {name: {} for name in MCDA_LAYERS}
+        slope_buffers = {}
+        out_buffers = {}
+
+        with rasterio.Env(**GDAL_ENV_OPTIONS), ExitStack() as stack:
+            grid = aoi_grid(DATA_LAYER_CATALOG[REFERENCE_LAYER], aoi_bounds)
+            vrts = {
+                name: stack.enter_context(open_aligned_vrt(
+                    DATA_LAYER_CATALOG[name],
+                    grid,
+                    LAYER_RESAMPLING.get(name, Resampling.bilinear)
+                ))
+                for name in MCDA_LAYERS
+            }
+            dem_nodata = _fill_value(vrts["dem"])
+
+            dst = stack.enter_context(rasterio.open(
+                blocks_path,
+                "w",
+                driver="GTiff",
+                count=1,
+                dtype="float32",
+                nodata=nodata_val,
+                tiled=True,
+                blockxsize=BLOCK_SIZE,
+                blockysize=BLOCK_SIZE,
+                compress="zstd",
+                BIGTIFF="IF_SAFER",
+                **grid
+            ))
+
+            # Block reads are bound by S3 range-request latency and GDAL
+            # releases the GIL while reading, so layers are fetched concurrently
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=len(MCDA_LAYERS)))
+
+            logger.info("Running weighted overlay block by block...")
+            log_blocks = logger.isEnabledFor(logging.DEBUG)
+            for _, window in dst.block_windows(1):
+                block_shape = (window.height, window.width)
+
+                # Blocks of the bounding-box grid that miss the AOI entirely
+                # (common for concave or diagonal AOIs) are written as nodata
+                # without reading any layer
+                if not aoi_prepared.intersects(box(*window_bounds(window, grid["transform"]))):
+                    out_block = _block_buffer(out_buffers, block_shape, np.float32)
+                    out_block.fill(nodata_val)
+                    dst.write(out_block, 1, window=window)
+                    continue
+
+                # Tested here rather than on the reader threads, which must not
+                # share the prepared geometry. The box includes the DEM halo,
+                # so it holds for every layer's read window.
+                halo_window = Window(window.col_off - 1, window.row_off - 1, window.width + 2, window.height + 2)
+                inside_aoi = aoi_prepared.contains(box(*window_bounds(halo_window, grid["transform"])))
+
+                # Partially covered block: rasterize the AOI once, shared by
+                # the halo-free layer reads and the output mask below
+                block_outside = None
+                if not inside_aoi:
+                    block_outside = geometry_mask(
+                        [aoi_shape],
+                        out_shape=block_shape,
+                        transform=window_transform(window, grid["transform"])
+                    )
+
+                futures = {
+                    # Slope needs a 1-pixel halo to be exact at block borders
+                    name: executor.submit(
+                        read_aoi_window,
+                        vrts[name],
+                        window,
+                        aoi_shape,
+                        1 if name == "dem" else 0,
+                        layer_buffers[name],
+                        inside_aoi,
+                        block_outside
+                    )
+                    for name in MCDA_LAYERS
+                }
+                block = {name: future.result() for name, future in futures.items()}
+
+                # 3. Calculate on-the-fly derivatives
+                slope_data = calculate_slope_from_dem(
+                    block["dem"],
+                    window_transform(window, grid["transform"]),
+                    dem_nodata,
+                    grid["crs"],
+                    out=_block_buffer(slope_buffers, block_shape, np.float32)
+                )
+
+                # 4-7. Evaluate constraints, normalize factors to 0-100, run the
+                # weighted overlay and count exclusions in a single fused pass
+                out_block = _block_buffer(out_buffers, block_shape, np.float32)
+
+                block_slope, block_lulc, block_grid, block_excluded = overlay(
+                    block["ghi"].ravel(),
+                    slope_data.ravel(),
+                    block["distance_to_grid"].ravel(),
+                    block["distance_to_roads"].ravel(),
+                    block["lulc"].ravel(),
+                    out_block.ravel(),
+                    overlay_params,
+                    slope_gt,
+                    grid_dist_gt,
+                    lulc_lut,
+                    nodata_val
+                )
+                n_slope += block_slope
+                n_lulc += block_lulc
+                n_grid += block_grid
+                n_excluded += block_excluded
+
+                if log_blocks:
+                    logger.debug("Block %s: excluded %d pixels", window, block_excluded)
+
+                # Pixels outside the AOI hold fill values that the kernel
+                # scores like data; they are nodata, as in fully outside blocks
+                if block_outside is not None:
+                    out_block[block_outside] = nodata_val
+
+                dst.write(out_block, 1, window=window)
+
+                # 9. Accumulate statistics
+                _update_running_stats(running, compute_stats(out_block.ravel(), nodata_val))
+
+        # One aggregated line from the counts reduced in the overlay pass
+        logger.info(
+            "Applied constraints, excluded %d pixels (slope: %d, land cover: %d, grid distance: %d)",
+            n_excluded, n_slope, n_lulc, n_grid
+        )
 
-        with rasterio.open(result_path, "w", **meta) as dst:
-            dst.write(final_map, 1)
+        # 8. Save result to S3
+        # Rewrite the block file as a Cloud Optimized GeoTIFF with overviews
+        logger.info("Saving result to S3...")
+        rasterio.shutil.copy(blocks_path, result_path, driver="COG", **COG_OPTIONS)
 
         # Upload to S3
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
-
         s3_key = f"results/{result_filename}"
-        s3_client.upload_file(
+        get_s3_client().upload_file(
             result_path,
             settings.S3_RESULTS_BUCKET,
-            s3_key
+            s3_key,
+            Config=RESULT_UPLOAD_CONFIG,
+            ExtraArgs={"ContentType": "image/tiff"}
         )
 
         result_url = f"s3://{settings.S3_RESULTS_BUCKET}/{s3_key}"
-        logger.info(f"Uploaded result to {result_url}")
+        logger.info("Uploaded result to %s", result_url)
 
         # 9. Calculate statistics
-        valid_data = final_map[final_map != nodata_val]
+        valid_pixels = running["count"]
         statistics = {
-            "total_pixels": int(ghi_data.size),
-            "valid_pixels": int(valid_data.size),
-            "excluded_pixels": int(np.sum(constraint_mask)),
-            "mean_suitability": float(np.mean(valid_data)) if valid_data.size > 0 else 0,
-            "max_suitability": float(np.max(valid_data)) if valid_data.size > 0 else 0,
-            "min_suitability": float(np.min(valid_data)) if valid_data.size > 0 else 0,
-            "std_suitability": float(np.std(valid_data)) if valid_data.size > 0 else 0,
+            "total_pixels": grid["width"] * grid["height"],
+            "valid_pixels": valid_pixels,
+            "excluded_pixels": n_excluded,
+            "mean_suitability": running["mean"] if valid_pixels > 0 else 0,
+            "max_suitability": running["max"] if valid_pixels > 0 else 0,
+            "min_suitability": running["min"] if valid_pixels > 0 else 0,
+            "std_suitability": math.sqrt(running["m2"] / valid_pixels) if valid_pixels > 0 else 0,
         }
 
-        logger.info(f"Statistics: {statistics}")
+        logger.info("Statistics: %s", statistics)
 
         # 10. TODO: Generate tile pyramid for web visualization
         tiles_url = None  # Placeholder
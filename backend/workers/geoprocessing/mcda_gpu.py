@@ -0,0 +1,99 @@
+"""Optional CuPy (CUDA) implementation of the MCDA weighted overlay."""
+
+import numpy as np
+
+from api.config import settings
+
+try:
+    import cupy as cp
+except ImportError:  # GPU support is optional (premium tier workers only)
+    cp = None
+
+
+# Fused clip/normalize/weight/constrain kernel, mirroring the kernels from
+# mcda_kernels.make_overlay_kernel; compiled once per input dtype combination
+# and evaluated without device-side temporaries. flags holds one bit per
+# constraint (1 = slope, 2 = land cover, 4 = grid distance).
+_OVERLAY_PREAMBLE = """
+__device__ float mcda_score(float x, float lo, float hi, float invert, float weight) {
+    if (weight == 0.0f) return 0.0f;
+    float n = (fminf(fmaxf(x, lo), hi) - lo) / (hi - lo);
+    if (invert != 0.0f) n = 1.0f - n;
+    return n * 100.0f * weight;
+}
+"""
+
+_OVERLAY_BODY = """
+unsigned char f = 0;
+int code = (int)lulc;
+if ((float)slope > slope_gt) f |= 1;
+if (code >= 0 && code < n_codes && lulc_lut[code]) f |= 2;
+if ((float)grid > grid_gt) f |= 4;
+flags = f;
+if (f) {
+    out = nodata;
+} else {
+    out = mcda_score((float)ghi, params[0], params[1], params[2], params[3])
+        + mcda_score((float)slope, params[4], params[5], params[6], params[7])
+        + mcda_score((float)grid, params[8], params[9], params[10], params[11])
+        + mcda_score((float)road, params[12], params[13], params[14], params[15]);
+}
+"""
+
+if cp is not None:
+    _overlay_kernel = cp.ElementwiseKernel(
+        "T1 ghi, T2 slope, T3 grid, T4 road, T5 lulc, raw float32 params, "
+        "float32 slope_gt, float32 grid_gt, raw bool lulc_lut, int32 n_codes, float32 nodata",
+        "float32 out, uint8 flags",
+        _OVERLAY_BODY,
+        "mcda_weighted_overlay",
+        preamble=_OVERLAY_PREAMBLE
+    )
+
+
+def gpu_available() -> bool:
+    """Check whether the GPU overlay is enabled and a CUDA device is present."""
+    if not settings.MCDA_USE_GPU or cp is None:
+        return False
+    try:
+        return cp.cuda.runtime.getDeviceCount() > 0
+    except cp.cuda.runtime.CUDARuntimeError:
+        return False
+
+
+def weighted_overlay_gpu(ghi, slope, grid, road, lulc, out, params,
+                         slope_gt, grid_gt, lulc_lut, nodata):
+    """
+    Run the weighted overlay on the GPU.
+
+    Drop-in replacement for the mcda_kernels.make_overlay_kernel kernels with the same
+    arguments: inputs are copied to the device on a dedicated stream, the
+    fused kernel runs there and the result is copied back into out.
+    Exclusion counts are reduced on the device from per-pixel flag bits.
+
+    Returns:
+        Tuple of pixel counts excluded by (slope, land cover, grid distance, any constraint)
+    """
+    with cp.cuda.Stream(non_blocking=True) as stream:
+        out_d, flags_d = _overlay_kernel(
+            cp.asarray(ghi),
+            cp.asarray(slope),
+            cp.asarray(grid),
+            cp.asarray(road),
+            cp.asarray(lulc),
+            cp.asarray(params, dtype=cp.float32).ravel(),
+            np.float32(slope_gt),
+            np.float32(grid_gt),
+            cp.asarray(lulc_lut),
+            np.int32(lulc_lut.size),
+            np.float32(nodata)
+        )
+        counts = (
+            int(cp.count_nonzero(flags_d & 1)),
+            int(cp.count_nonzero(flags_d & 2)),
+            int(cp.count_nonzero(flags_d & 4)),
+            int(cp.count_nonzero(flags_d))
+        )
+        out_d.get(stream=stream, out=out)
+
+    return counts
@@ -0,0 +1,197 @@
+"""Numba kernels for the MCDA weighted overlay and terrain derivatives."""
+
+import functools
+import math
+from typing import Tuple
+
+import numba
+import numpy as np
+
+# Row order of the factor parameter table passed to the overlay kernels
+FACTORS = ("ghi", "slope", "grid_dist", "road_dist")
+
+# float32 constants, so the overlay arithmetic is not promoted to float64
+# (twice the SIMD lanes, half the cache footprint; scores only span 0-100)
+_ONE = np.float32(1.0)
+_HUNDRED = np.float32(100.0)
+
+# Fast-math without the no-NaN/no-Inf assumptions, so an infinite threshold
+# can stand for "constraint not set" and NaN inputs compare as in NumPy
+FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+# Source template of the weighted overlay kernel. Each pixel is read once,
+# no per-factor normalized arrays are allocated, and exclusion counts are
+# reduced in the same pass. {setup} hoists per-factor constants and {terms}
+# adds one clip/normalize/weight expression per weighted factor.
+_OVERLAY_TEMPLATE = """
+def weighted_overlay(ghi, slope, grid, road, lulc, out, params,
+                     slope_gt, grid_gt, lulc_lut, nodata):
+    n_slope = 0
+    n_lulc = 0
+    n_grid = 0
+    n_excluded = 0
+    n_codes = lulc_lut.size
+{setup}
+    for i in numba.prange(out.size):
+        excluded = False
+
+        if slope[i] > slope_gt:
+            excluded = True
+            n_slope += 1
+
+        code = lulc[i]
+        if code >= 0 and code < n_codes and lulc_lut[code]:
+            excluded = True
+            n_lulc += 1
+
+        if grid[i] > grid_gt:
+            excluded = True
+            n_grid += 1
+
+        if excluded:
+            out[i] = nodata
+            n_excluded += 1
+        else:
+            acc = _ZERO
+{terms}
+            out[i] = acc
+
+    return n_slope, n_lulc, n_grid, n_excluded
+"""
+
+# Kernel argument holding each factor, in FACTORS order
+_FACTOR_ARGS = ("ghi", "slope", "grid", "road")
+
+
+@functools.lru_cache(maxsize=64)
+def make_overlay_kernel(factors: Tuple[str, ...], inverts: Tuple[bool, ...]):
+    """
+    Compile a weighted overlay kernel specialized for one factor recipe.
+
+    Unweighted factors are left out of the generated loop and invert flags
+    are baked in, so the per-pixel body is branch-free arithmetic that LLVM
+    can vectorize. Kernels are cached per recipe for the life of the worker
+    process.
+
+    The returned kernel takes (ghi, slope, grid, road, lulc, out, params,
+    slope_gt, grid_gt, lulc_lut, nodata):
+        ghi, slope, grid, road, lulc: Flattened input layers of equal size
+        out: Flattened float32 output (suitability 0-100, nodata where excluded)
+        params: (4, 4) float32 array of (min, max, invert, weight fraction) rows in FACTORS order
+        slope_gt: Slope exclusion threshold as float32 (inf when unset)
+        grid_gt: Grid distance exclusion threshold as float32 (inf when unset)
+        lulc_lut: Bool lookup table indexed by land cover code, True if excluded
+        nodata: Value written to excluded pixels
+    and returns the pixel counts excluded by (slope, land cover, grid
+    distance, any constraint).
+
+    Args:
+        factors: Weighted factor names, a subset of FACTORS
+        inverts: Whether each factor scores higher for lower values
+
+    Returns:
+        Compiled Numba kernel
+    """
+    setup = []
+    terms = []
+    for name, invert in zip(factors, inverts):
+        k = FACTORS.index(name)
+        setup.append(
+            f"    lo{k} = params[{k}, 0]\n"
+            f"    hi{k} = params[{k}, 1]\n"
+            f"    scale{k} = _ONE / (hi{k} - lo{k})\n"
+            f"    w{k} = params[{k}, 3] * _HUNDRED"
+        )
+        norm = f"(min(max(np.float32({_FACTOR_ARGS[k]}[i]), lo{k}), hi{k}) - lo{k}) * scale{k}"
+        if invert:
+            norm = f"(_ONE - {norm})"
+        terms.append(f"            acc += {norm} * w{k}")
+
+    source = _OVERLAY_TEMPLATE.format(setup="\n".join(setup), terms="\n".join(terms))
+    namespace = {
+        "numba": numba,
+        "np": np,
+        "_ZERO": np.float32(0.0),
+        "_ONE": _ONE,
+        "_HUNDRED": _HUNDRED,
+    }
+    exec(compile(source, f"<mcda overlay {'+'.join(factors) or 'empty'}>", "exec"), namespace)
+    return numba.njit(parallel=True, fastmath=FASTMATH)(namespace["weighted_overlay"])
+
+
+@numba.njit(inline="always")
+def _neighbour(z, centre, nodata):
+    """Substitute the centre elevation for a nodata neighbour."""
+    return centre if z == nodata else z
+
+
+@numba.njit(parallel=True, fastmath=FASTMATH, cache=True)
+def horn_slope(dem, px, py, nodata, out):
+    """
+    Calculate slope in degrees with Horn's 3x3 finite-difference method.
+
+    Args:
+        dem: DEM with a 1-pixel halo, shape (rows + 2, cols + 2)
+        px: Pixel width in metres for each output row (varies with latitude
+            on geographic grids)
+        py: Pixel height in metres
+        nodata: DEM nodata value; also written where the centre cell is nodata
+        out: Output slope array, shape (rows, cols)
+    """
+    rows, cols = out.shape
+    for r in numba.prange(rows):
+        x_scale = 1.0 / (8.0 * px[r])
+        y_scale = 1.0 / (8.0 * py)
+        for c in range(cols):
+            z5 = dem[r + 1, c + 1]
+            if z5 == nodata:
+                out[r, c] = nodata
+                continue
+
+            z1 = _neighbour(dem[r, c], z5, nodata)
+            z2 = _neighbour(dem[r, c + 1], z5, nodata)
+            z3 = _neighbour(dem[r, c + 2], z5, nodata)
+            z4 = _neighbour(dem[r + 1, c], z5, nodata)
+            z6 = _neighbour(dem[r + 1, c + 2], z5, nodata)
+            z7 = _neighbour(dem[r + 2, c], z5, nodata)
+            z8 = _neighbour(dem[r + 2, c + 1], z5, nodata)
+            z9 = _neighbour(dem[r + 2, c + 2], z5, nodata)
+
+            dzdx = ((z3 + 2.0 * z6 + z9) - (z1 + 2.0 * z4 + z7)) * x_scale
+            dzdy = ((z7 + 2.0 * z8 + z9) - (z1 + 2.0 * z2 + z3)) * y_scale
+            out[r, c] = math.degrees(math.atan(math.sqrt(dzdx * dzdx + dzdy * dzdy)))
+
+
+@numba.njit(fastmath=FASTMATH, cache=True)
+def compute_stats(values, nodata):
+    """
+    Count, min, max, mean and M2 of the valid values in one pass (Welford).
+
+    Args:
+        values: Flattened array
+        nodata: Value of pixels to skip
+
+    Returns:
+        Tuple of (count, min, max, mean, M2); min/max are +inf/-inf when count is 0
+    """
+    n = 0
+    lo = np.inf
+    hi = -np.inf
+    mean = 0.0
+    m2 = 0.0
+
+    for i in range(values.size):
+        x = values[i]
+        if x == nodata:
+            continue
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        if x < lo:
+            lo = x
+        if x > hi:
+            hi = x
+
+    return n, lo, hi, mean, m2
@@ -1,7 +1,7 @@
 """Celery task definitions."""
 
 from celery import Task
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, scoped_session
 import logging
 
 from workers.celery_app import celery_app
@@ -11,22 +11,20 @@ from models.project import AnalysisJob, JobStatus
 
 logger = logging.getLogger(__name__)
 
+# Thread-scoped sessions; remove() after each task returns the connection to
+# the engine pool instead of opening a new one for the next task
+ScopedSession = scoped_session(SessionLocal)
+
 
 class DatabaseTask(Task):
     """Base task with database session management."""
 
-    _db: Session = None
-
     @property
     def db(self) -> Session:
-        if self._db is None:
-            self._db = SessionLocal()
-        return self._db
+        return ScopedSession()
 
     def after_return(self, *args, **kwargs):
-        if self._db is not None:
-            self._db.close()
-            self._db = None
+        ScopedSession.remove()
 
 
 @celery_app.task(base=DatabaseTask, bind=True, name="run_mcda_analysis")
@@ -43,7 +41,13 @@ def run_mcda_analysis(self, job_id: int):
     logger.info(f"Starting MCDA analysis for job {job_id}")
 
     db = self.db
-    job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    # Load the job together with its AOI (and geometry) in one statement
+    job = (
+        db.query(AnalysisJob)
+        .options(joinedload(AnalysisJob.aoi))
+        .filter(AnalysisJob.id == job_id)
+        .first()
+    )
 
     if not job:
         logger.error(f"Job {job_id} not found")
@@ -182,8 +182,11 @@ class DataPipeline:
         convert_directory_to_cog(
             input_dir=self.processed_dir,
             output_dir=self.cog_dir,
-            compression='DEFLATE',
-            blocksize=512
+            compression='ZSTD',
+            blocksize=512,
+            zstd_level=9,
+            predictor=True,
+            num_threads='ALL_CPUS'
         )
 
         logger.info("COG conversion complete")
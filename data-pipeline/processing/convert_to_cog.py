@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Cloud-Optimized GeoTIFF conversion.
+
+Converts processed rasters to COGs with GDAL's COG driver:
+tiled, ZSTD-compressed, with internal overviews.
+"""
+
+import logging
+from pathlib import Path
+from osgeo import gdal
+
+logger = logging.getLogger(__name__)
+
+# Enable GDAL exceptions
+gdal.UseExceptions()
+
+# Layers holding class codes; their overviews must not average values
+CATEGORICAL_LAYERS = {'lulc'}
+
+
+def convert_to_cog(
+    input_path: Path,
+    output_path: Path,
+    compression: str = 'ZSTD',
+    blocksize: int = 512,
+    zstd_level: int = 9,
+    predictor: bool = True,
+    num_threads: str = 'ALL_CPUS'
+):
+    """
+    Convert one raster to a Cloud-Optimized GeoTIFF.
+
+    Args:
+        input_path: Input raster
+        output_path: Output COG path
+        compression: Compression codec (ZSTD, DEFLATE, LZW, ...)
+        blocksize: Internal tile size in pixels
+        zstd_level: ZSTD compression level
+        predictor: Use the horizontal/floating-point predictor matching the data type
+        num_threads: Compression worker threads (e.g. 'ALL_CPUS')
+    """
+    resampling = 'NEAREST' if Path(input_path).stem in CATEGORICAL_LAYERS else 'AVERAGE'
+
+    creation_options = [
+        f'COMPRESS={compression}',
+        f'BLOCKSIZE={blocksize}',
+        f'NUM_THREADS={num_threads}',
+        f'OVERVIEW_RESAMPLING={resampling}',
+        'BIGTIFF=IF_SAFER'
+    ]
+    if compression.upper() == 'ZSTD':
+        creation_options.append(f'LEVEL={zstd_level}')
+    if predictor:
+        creation_options.append('PREDICTOR=YES')
+
+    with gdal.config_options({
+        'GDAL_NUM_THREADS': num_threads,
+        'GDAL_TIFF_INTERNAL_MASK': 'YES'
+    }):
+        gdal.Translate(
+            str(output_path),
+            str(input_path),
+            format='COG',
+            creationOptions=creation_options
+        )
+
+    logger.info(f"Created COG: {output_path}")
+
+
+def convert_directory_to_cog(
+    input_dir: Path,
+    output_dir: Path,
+    compression: str = 'ZSTD',
+    blocksize: int = 512,
+    zstd_level: int = 9,
+    predictor: bool = True,
+    num_threads: str = 'ALL_CPUS'
+):
+    """
+    Convert every GeoTIFF in a directory to a Cloud-Optimized GeoTIFF.
+
+    Args:
+        input_dir: Directory containing processed rasters
+        output_dir: Output directory for COGs (same file names)
+        compression: Compression codec (ZSTD, DEFLATE, LZW, ...)
+        blocksize: Internal tile size in pixels
+        zstd_level: ZSTD compression level
+        predictor: Use the horizontal/floating-point predictor matching the data type
+        num_threads: Compression worker threads (e.g. 'ALL_CPUS')
+    """
+    input_dir = Path(input_dir)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    rasters = sorted(input_dir.glob('*.tif'))
+    if not rasters:
+        raise FileNotFoundError(f"No rasters found in {input_dir}")
+
+    logger.info(f"Converting {len(rasters)} rasters to COG ({compression})")
+
+    for raster in rasters:
+        convert_to_cog(
+            raster,
+            output_dir / raster.name,
+            compression=compression,
+            blocksize=blocksize,
+            zstd_level=zstd_level,
+            predictor=predictor,
+            num_threads=num_threads
+        )
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert rasters to Cloud-Optimized GeoTIFF')
+    parser.add_argument('--input', required=True, help='Input directory with processed rasters')
+    parser.add_argument('--output', required=True, help='Output directory for COGs')
+    parser.add_argument('--compression', default='ZSTD', help='Compression codec')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    convert_directory_to_cog(
+        Path(args.input),
+        Path(args.output),
+        compression=args.compression
+    )
@@ -0,0 +1,66 @@
+"""Numba kernels for DEM terrain derivatives."""
+
+import math
+
+import numba
+
+# Fast-math without the no-NaN/no-Inf assumptions, so NaN nodata cells are
+# still detected
+FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+@numba.njit(parallel=True, fastmath=FASTMATH, cache=True)
+def slope_aspect_tile(z, cx, cy, slope_scale, aspect_scale, slope_nodata, aspect_nodata,
+                      slope_out, aspect_out):
+    """
+    Calculate quantized slope and aspect with Horn's 3x3 method.
+
+    Values are written as round(degrees / scale) into integer outputs.
+    Aspect follows gdal.DEMProcessing: azimuth clockwise from north, 0 for
+    flat cells.
+
+    Args:
+        z: DEM tile with a 1-pixel halo, shape (rows + 2, cols + 2), NaN where nodata
+        cx: Pixel width for each output row, in elevation units (varies
+            with latitude on geographic grids)
+        cy: Pixel height in elevation units
+        slope_scale: Degrees per slope output unit
+        aspect_scale: Degrees per aspect output unit
+        slope_nodata: Slope value written where any cell of the 3x3 window is nodata
+        aspect_nodata: Aspect value written where any cell of the 3x3 window is nodata
+        slope_out: Output slope array, shape (rows, cols)
+        aspect_out: Output aspect array, shape (rows, cols)
+    """
+    rows, cols = slope_out.shape
+    y_scale = 1.0 / (8.0 * cy)
+    full_circle = round(360.0 / aspect_scale)
+    for r in numba.prange(rows):
+        x_scale = 1.0 / (8.0 * cx[r])
+        for c in range(cols):
+            z1 = z[r, c]
+            z2 = z[r, c + 1]
+            z3 = z[r, c + 2]
+            z4 = z[r + 1, c]
+            z6 = z[r + 1, c + 2]
+            z7 = z[r + 2, c]
+            z8 = z[r + 2, c + 1]
+            z9 = z[r + 2, c + 2]
+
+            dzdx = ((z3 + 2.0 * z6 + z9) - (z1 + 2.0 * z4 + z7)) * x_scale
+            dzdy = ((z7 + 2.0 * z8 + z9) - (z1 + 2.0 * z2 + z3)) * y_scale
+
+            if math.isnan(dzdx) or math.isnan(dzdy) or math.isnan(z[r + 1, c + 1]):
+                slope_out[r, c] = slope_nodata
+                aspect_out[r, c] = aspect_nodata
+                continue
+
+            slope = math.degrees(math.atan(math.sqrt(dzdx * dzdx + dzdy * dzdy)))
+            slope_out[r, c] = round(slope / slope_scale)
+
+            if dzdx == 0.0 and dzdy == 0.0:
+                aspect_out[r, c] = 0
+            else:
+                aspect = math.degrees(math.atan2(dzdy, -dzdx))
+                aspect = 450.0 - aspect if aspect > 90.0 else 90.0 - aspect
+                q = round(aspect / aspect_scale)
+                aspect_out[r, c] = 0 if q >= full_circle else q
@@ -9,51 +9,373 @@ Processes SRTM DEM tiles:
 4. Derive slope and aspect
 """
 
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional, Tuple
+import numpy as np
 from osgeo import gdal
-import subprocess
+
+try:
+    from processing.dem_kernels import slope_aspect_tile
+except ModuleNotFoundError:  # Run as a script from processing/
+    from dem_kernels import slope_aspect_tile
+
+try:
+    import dask
+    import dask.array
+    import rioxarray
+except ImportError:  # The dask engine is optional
+    rioxarray = None
 
 logger = logging.getLogger(__name__)
 
 # Enable GDAL exceptions
 gdal.UseExceptions()
 
+# GDAL settings for reading large tile mosaics
+GDAL_CONFIG_OPTIONS = {
+    'GDAL_CACHEMAX': '50%',  # Keep decoded source blocks instead of re-reading them
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',  # No directory scan per tile open
+    'VRT_SHARED_SOURCE': '0',  # Per-thread tile handles for the multithreaded warper
+    'GDAL_NUM_THREADS': 'ALL_CPUS'
+}
+
+# Horizontal differencing predictor for the integer DEM and derivative outputs
+PREDICTOR_INTEGER = 2
+
+# SRTM tile names encode the lower-left corner of a 1x1 degree tile
+HGT_NAME_PATTERN = re.compile(r'([NS])(\d{2})([EW])(\d{3})\.hgt$', re.IGNORECASE)
+
+# Approximate metres per degree, for slope on geographic (EPSG:4326) grids
+METERS_PER_DEGREE_LAT = 110_574.0
+METERS_PER_DEGREE_LON = 111_320.0
+
+# Elevation resampling for reprojection; cubic keeps ridges and valleys that
+# bilinear smooths away before slope/aspect are derived
+DEM_RESAMPLING = 'cubic'
+
+# Share of physical RAM the in-memory pipeline may use, and the multiple of
+# the DEM size it needs (the DEM plus FillNodata's working rasters); larger
+# DEMs are processed tile by tile instead
+MEM_PIPELINE_RAM_FRACTION = 0.5
+MEM_PIPELINE_OVERHEAD = 4
+
+# FillNodata settings: search distance for valid values and smoothing passes
+FILL_MAX_SEARCH_DIST = 100
+FILL_SMOOTHING_ITERATIONS = 2
+
+# Smallest tile halo that fills voids and derives slope exactly as the
+# in-memory pipeline: the fill search, its 3x3 smoothing passes and the
+# slope stencil
+MIN_TILE_OVERLAP = FILL_MAX_SEARCH_DIST + FILL_SMOOTHING_ITERATIONS + 1
+
+# Above this many tiles, the gdalbuildvrt program reads its inputs from a
+# text file list (-input_file_list is not available through gdal.BuildVRT)
+FILE_LIST_THRESHOLD = 1000
+
+# Cached mosaic VRTs live in this subdirectory of the output VRT's directory.
+# Bump the version whenever the BuildVRT options or the VRT post-processing
+# change, so VRTs cached by older code are rebuilt.
+MOSAIC_CACHE_DIR = 'vrt_cache'
+MOSAIC_CACHE_VERSION = 2
+
+# Quantized slope/aspect encodings as (GDAL type, NumPy type, degrees per
+# unit, nodata): slope 0-90 degrees in 0.5 degree steps, aspect 0-360 degrees
+# in 0.01 degree steps. The scale is recorded on the band (SetScale).
+SLOPE_ENCODING = (gdal.GDT_Byte, np.uint8, 0.5, 255)
+ASPECT_ENCODING = (gdal.GDT_UInt16, np.uint16, 0.01, 65535)
+
 
-def mosaic_dem_tiles(input_dir: Path, output_vrt: Path):
+def gtiff_creation_options(predictor: int, block_size: int = 512) -> list:
+    """
+    GeoTIFF creation options for pipeline outputs.
+
+    Args:
+        predictor: TIFF predictor (e.g. PREDICTOR_INTEGER)
+        block_size: Tile size in pixels
+
+    Returns:
+        List of GTiff creation options
+    """
+    return [
+        'TILED=YES',
+        f'BLOCKXSIZE={block_size}',
+        f'BLOCKYSIZE={block_size}',
+        'COMPRESS=ZSTD',
+        'ZSTD_LEVEL=1',
+        f'PREDICTOR={predictor}',
+        'NUM_THREADS=ALL_CPUS',  # Parallel compression
+        'BIGTIFF=IF_SAFER',
+        'SPARSE_OK=TRUE'
+    ]
+
+
+def cog_creation_options(block_size: int = 512) -> list:
+    """
+    COG driver creation options for pipeline outputs, with internal overviews.
+
+    Args:
+        block_size: Tile size in pixels
+
+    Returns:
+        List of COG creation options
+    """
+    return [
+        f'BLOCKSIZE={block_size}',
+        'COMPRESS=ZSTD',
+        'LEVEL=1',
+        'PREDICTOR=YES',  # Predictor matching the data type
+        'OVERVIEWS=AUTO',
+        'OVERVIEW_RESAMPLING=AVERAGE',
+        'NUM_THREADS=ALL_CPUS',
+        'BIGTIFF=IF_SAFER',
+        'SPARSE_OK=TRUE'  # Leave all-nodata tiles unwritten
+    ]
+
+
+def _hgt_bounds(path: str) -> Optional[Tuple[float, float, float, float]]:
+    """Get an SRTM .hgt tile's bounds from its file name, or None if it does not match."""
+    match = HGT_NAME_PATTERN.search(os.path.basename(path))
+    if not match:
+        return None
+    lat_hemi, lat, lon_hemi, lon = match.groups()
+    south = int(lat) * (-1 if lat_hemi.upper() == 'S' else 1)
+    west = int(lon) * (-1 if lon_hemi.upper() == 'W' else 1)
+    return (west, south, west + 1, south + 1)
+
+
+def _raster_bounds(path: str) -> Tuple[float, float, float, float]:
+    """Get a raster's bounds from its geotransform (header read only)."""
+    ds = gdal.Open(path)
+    minx, xres, _, maxy, _, yres = ds.GetGeoTransform()
+    maxx = minx + xres * ds.RasterXSize
+    miny = maxy + yres * ds.RasterYSize
+    return (minx, miny, maxx, maxy)
+
+
+def _intersects(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    """Check whether two (minx, miny, maxx, maxy) boxes overlap."""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def filter_tiles_by_bounds(
+    dem_files: list,
+    aoi_bounds: Tuple[float, float, float, float],
+    max_workers: int = 16
+) -> list:
+    """
+    Keep only the DEM tiles that intersect a bounding box.
+
+    SRTM .hgt tiles are located from their file names without any I/O; other
+    tiles have their headers read in parallel.
+
+    Args:
+        dem_files: DEM tile paths
+        aoi_bounds: (minx, miny, maxx, maxy) in the tiles' CRS
+        max_workers: Threads used to read tile headers
+
+    Returns:
+        Intersecting tile paths, in input order
+    """
+    tile_bounds = {f: _hgt_bounds(f) for f in dem_files if f.lower().endswith('.hgt')}
+
+    unnamed = [f for f in dem_files if tile_bounds.get(f) is None]
+    if unnamed:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            tile_bounds.update(zip(unnamed, executor.map(_raster_bounds, unnamed)))
+
+    return [f for f in dem_files if _intersects(tile_bounds[f], aoi_bounds)]
+
+
+def _mosaic_cache_key(
+    tile_mtimes: dict,
+    aoi_bounds: Optional[Tuple[float, float, float, float]]
+) -> Tuple[str, str]:
+    """
+    Hash a mosaic's inputs into (tile set, AOI) cache keys.
+
+    The tile set key covers the cache version and the tile paths with their
+    modification times; the AOI key covers the bbox filter.
+    """
+    tiles_digest = hashlib.sha1(f'{MOSAIC_CACHE_VERSION}\n'.encode())
+    for path in sorted(tile_mtimes):
+        tiles_digest.update(f'{path}\0{tile_mtimes[path]}\n'.encode())
+    aoi_digest = hashlib.sha1(repr(aoi_bounds).encode())
+    return tiles_digest.hexdigest()[:16], aoi_digest.hexdigest()[:16]
+
+
+def _fix_scanline_block_sizes(vrt_path: Path, block_ysize: int = 512) -> int:
+    """
+    Rewrite scanline (BlockYSize=1) source block sizes in a VRT.
+
+    The VRT reader issues one request per line for such sources; reading them
+    in taller blocks turns that into one request per block.
+
+    Args:
+        vrt_path: VRT file to rewrite in place
+        block_ysize: Block height to declare, capped at each source's height
+
+    Returns:
+        Number of sources rewritten
+    """
+    tree = ET.parse(vrt_path)
+    rewritten = 0
+    for props in tree.iter('SourceProperties'):
+        if props.get('BlockYSize') == '1':
+            props.set('BlockYSize', str(min(block_ysize, int(props.get('RasterYSize', block_ysize)))))
+            rewritten += 1
+    if rewritten:
+        tree.write(vrt_path)
+    return rewritten
+
+
+def _build_vrt(vrt_path: Path, dem_files: list, file_list: Path):
+    """
+    Build a VRT mosaic of dem_files.
+
+    Large tile sets are written to file_list and passed to the gdalbuildvrt
+    program with -input_file_list, which parses the list in C instead of
+    converting every path through the bindings; the GDAL library API (and so
+    gdal.BuildVRT) does not accept that option. file_list is removed
+    afterwards.
+
+    Args:
+        vrt_path: Output VRT file path
+        dem_files: DEM tile paths
+        file_list: Scratch path for the tile list of large tile sets
+    """
+    if len(dem_files) <= FILE_LIST_THRESHOLD:
+        gdal.BuildVRT(
+            str(vrt_path),
+            dem_files,
+            options=gdal.BuildVRTOptions(resampleAlg='bilinear', addAlpha=False)
+        )
+        return
+
+    file_list.write_text('\n'.join(dem_files))
+    try:
+        subprocess.run(
+            ['gdalbuildvrt', '-q', '-r', 'bilinear',
+             '-input_file_list', str(file_list), str(vrt_path)],
+            env={**os.environ, **GDAL_CONFIG_OPTIONS},
+            check=True,
+            capture_output=True,
+            text=True
+        )
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"gdalbuildvrt failed: {e.stderr.strip()}") from e
+    finally:
+        file_list.unlink(missing_ok=True)
+
+
+def mosaic_dem_tiles(
+    input_dir: Path,
+    output_vrt: Path,
+    aoi_bounds: Optional[Tuple[float, float, float, float]] = None
+):
     """
     Create a VRT mosaic from DEM tiles.
 
     Args:
         input_dir: Directory containing .hgt or .tif DEM tiles
         output_vrt: Output VRT file path
+        aoi_bounds: Optional (minx, miny, maxx, maxy) in the tiles' CRS;
+            only intersecting tiles are added to the mosaic
+
+    The VRT is cached in a vrt_cache directory next to output_vrt under a
+    key of the cache version, the tile paths, their modification times and
+    aoi_bounds, so re-runs over an unchanged tile set skip opening every
+    tile. Building a new mosaic removes cached VRTs of output_vrt that were
+    built from a different tile set.
     """
     logger.info(f"Creating DEM mosaic from {input_dir}")
 
-    # Find all DEM files
-    dem_files = list(input_dir.glob("*.hgt")) + list(input_dir.glob("*.tif"))
+    # Find all DEM files in one directory pass; absolute paths keep the cache
+    # key independent of the working directory and the cached VRT portable
+    with os.scandir(Path(input_dir).resolve()) as entries:
+        tile_mtimes = {
+            entry.path: entry.stat().st_mtime_ns
+            for entry in entries
+            if entry.name.endswith(('.hgt', '.tif'))
+        }
+    dem_files = list(tile_mtimes)
 
     if not dem_files:
         raise FileNotFoundError(f"No DEM files found in {input_dir}")
 
     logger.info(f"Found {len(dem_files)} DEM tiles")
 
-    # Build VRT
-    gdal.BuildVRT(
-        str(output_vrt),
-        [str(f) for f in dem_files],
-        options=gdal.BuildVRTOptions(
-            resampleAlg='bilinear',
-            addAlpha=False
-        )
-    )
+    output_vrt = Path(output_vrt)
+    tiles_key, aoi_key = _mosaic_cache_key(tile_mtimes, aoi_bounds)
+    cache_dir = output_vrt.parent / MOSAIC_CACHE_DIR
+    cached_vrt = cache_dir / f'{output_vrt.stem}.{tiles_key}.{aoi_key}.vrt'
+    if cached_vrt.exists():
+        shutil.copyfile(cached_vrt, output_vrt)
+        logger.info(f"Reused cached VRT mosaic: {cached_vrt}")
+        return
+
+    if aoi_bounds is not None:
+        dem_files = filter_tiles_by_bounds(dem_files, aoi_bounds)
+        if not dem_files:
+            raise FileNotFoundError(f"No DEM tiles in {input_dir} intersect {aoi_bounds}")
+        logger.info(f"{len(dem_files)} DEM tiles intersect {aoi_bounds}")
+
+    # Drop cached VRTs built from another tile set (changed tiles or an older
+    # cache version); those for other AOIs over this tile set stay valid
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cached_name = re.compile(rf'{re.escape(output_vrt.stem)}\.([0-9a-f]{{16}})\.[0-9a-f]{{16}}\.vrt')
+    for cached in cache_dir.iterdir():
+        match = cached_name.fullmatch(cached.name)
+        if match and match.group(1) != tiles_key:
+            cached.unlink()
+            logger.info(f"Removed stale cached VRT mosaic: {cached}")
+
+    try:
+        _build_vrt(cached_vrt, dem_files, cache_dir / f'{output_vrt.stem}.tiles.txt')
+        rewritten = _fix_scanline_block_sizes(cached_vrt)
+    except BaseException:
+        # Never leave a half-built VRT behind for a later run to reuse
+        cached_vrt.unlink(missing_ok=True)
+        raise
 
+    if rewritten:
+        logger.info(f"Rewrote scanline block size of {rewritten} VRT sources")
+
+    shutil.copyfile(cached_vrt, output_vrt)
     logger.info(f"Created VRT mosaic: {output_vrt}")
 
 
+def fill_band_voids(band: gdal.Band):
+    """
+    Fill voids in a DEM band in place with GDAL's FillNodata.
+
+    Args:
+        band: DEM band, opened for update
+    """
+    gdal.FillNodata(
+        targetBand=band,
+        maskBand=None,  # Use the band's nodata mask
+        maxSearchDist=FILL_MAX_SEARCH_DIST,
+        smoothingIterations=FILL_SMOOTHING_ITERATIONS,
+        options=['TEMP_FILE_DRIVER=MEM']
+    )
+    band.FlushCache()
+
+
 def fill_dem_voids(input_dem: Path, output_dem: Path):
     """
-    Fill voids in DEM using gdal_fillnodata.
+    Fill voids in DEM using GDAL's FillNodata, in-process.
 
     Args:
         input_dem: Input DEM
@@ -61,109 +383,423 @@ def fill_dem_voids(input_dem: Path, output_dem: Path):
     """
     logger.info(f"Filling DEM voids...")
 
-    cmd = [
-        'gdal_fillnodata.py',
-        '-md', '100',  # Max distance to search for values
-        '-si', '2',    # Smoothing iterations
-        str(input_dem),
-        str(output_dem)
-    ]
+    src_ds = gdal.Open(str(input_dem))
+    dst_ds = gdal.GetDriverByName('GTiff').CreateCopy(
+        str(output_dem),
+        src_ds,
+        options=gtiff_creation_options(PREDICTOR_INTEGER)
+    )
+    src_ds = None
+
+    fill_band_voids(dst_ds.GetRasterBand(1))
+    dst_ds = None
 
-    subprocess.run(cmd, check=True)
     logger.info(f"Filled DEM saved to {output_dem}")
 
 
-def calculate_slope(input_dem: Path, output_slope: Path):
+def _row_pixel_sizes(ds: gdal.Dataset) -> Tuple[np.ndarray, float]:
     """
-    Calculate slope in degrees from DEM.
+    Get the pixel width of every row and the pixel height of a DEM grid.
+
+    Geographic grids are converted from degrees to metres, with the width
+    scaled by the cosine of each row's latitude, so the slope kernel needs
+    one cosine per row instead of one per pixel.
 
     Args:
-        input_dem: Input DEM
-        output_slope: Output slope raster
+        ds: DEM dataset
+
+    Returns:
+        Tuple of (pixel width per row, pixel height)
     """
-    logger.info(f"Calculating slope...")
+    _, xres, _, y0, _, yres = ds.GetGeoTransform()
+    rows = ds.RasterYSize
+    srs = ds.GetSpatialRef()
+    if srs is not None and srs.IsGeographic():
+        row_lat = y0 + yres * (np.arange(rows) + 0.5)
+        x_res_rows = abs(xres) * METERS_PER_DEGREE_LON * np.cos(np.radians(row_lat))
+        return x_res_rows, abs(yres) * METERS_PER_DEGREE_LAT
+    return np.full(rows, abs(xres)), abs(yres)
 
-    gdal.DEMProcessing(
-        str(output_slope),
-        str(input_dem),
-        'slope',
-        computeEdges=True,
-        slopeFormat='degree'
+
+def _block_coverage(ds: gdal.Dataset, block_size: int) -> Optional[np.ndarray]:
+    """
+    Find which blocks of a DEM hold any valid elevation.
+
+    Warps the DEM to one pixel per block with max resampling, which ignores
+    nodata, so a block's pixel is nodata only if every cell in it is.
+
+    Args:
+        ds: DEM dataset
+        block_size: Block size in pixels
+
+    Returns:
+        Bool array of shape (block rows, block cols), or None if the DEM has
+        no nodata value
+    """
+    nodata = ds.GetRasterBand(1).GetNoDataValue()
+    if nodata is None:
+        return None
+
+    x0, xres, _, y0, _, yres = ds.GetGeoTransform()
+    block_cols = -(-ds.RasterXSize // block_size)
+    block_rows = -(-ds.RasterYSize // block_size)
+    coverage_ds = gdal.Warp(
+        '',
+        ds,
+        format='MEM',
+        outputBounds=(x0, y0 + block_rows * block_size * yres, x0 + block_cols * block_size * xres, y0),
+        width=block_cols,
+        height=block_rows,
+        resampleAlg='max',
+        srcNodata=nodata,
+        dstNodata=nodata
     )
+    return coverage_ds.GetRasterBand(1).ReadAsArray() != nodata
+
+
+def calculate_slope_and_aspect(
+    input_dem,
+    output_slope: Path,
+    output_aspect: Path,
+    block_size: int = 512
+):
+    """
+    Calculate slope and aspect in degrees from DEM in a single pass.
+
+    Both products share the same gradients, so each DEM block is read once
+    (with a 1-pixel halo, edge values repeated at the raster border) and
+    written to both outputs. Outputs are quantized to SLOPE_ENCODING and
+    ASPECT_ENCODING, with the band scale set to recover degrees. Blocks
+    without any valid elevation (e.g. ocean) are skipped and left sparse,
+    so they read back as nodata.
+
+    Args:
+        input_dem: Input DEM path, or an open gdal.Dataset
+        output_slope: Output slope raster
+        output_aspect: Output aspect raster
+        block_size: Processing and output tile size in pixels
+    """
+    logger.info("Calculating slope and aspect...")
+
+    src_ds = input_dem if isinstance(input_dem, gdal.Dataset) else gdal.Open(str(input_dem))
+    src_band = src_ds.GetRasterBand(1)
+    nodata = src_band.GetNoDataValue()
+    width, height = src_ds.RasterXSize, src_ds.RasterYSize
+    geotransform = src_ds.GetGeoTransform()
+    x_res_rows, y_res = _row_pixel_sizes(src_ds)
+
+    driver = gdal.GetDriverByName('GTiff')
+    out_datasets = []
+    for path, (gdal_type, _, scale, out_nodata) in (
+        (output_slope, SLOPE_ENCODING),
+        (output_aspect, ASPECT_ENCODING)
+    ):
+        out_ds = driver.Create(
+            str(path),
+            width,
+            height,
+            1,
+            gdal_type,
+            options=gtiff_creation_options(PREDICTOR_INTEGER, block_size)
+        )
+        out_ds.SetGeoTransform(geotransform)
+        out_ds.SetProjection(src_ds.GetProjection())
+        out_band = out_ds.GetRasterBand(1)
+        out_band.SetNoDataValue(out_nodata)
+        out_band.SetScale(scale)
+        out_band.SetOffset(0.0)
+        out_datasets.append(out_ds)
+    slope_band = out_datasets[0].GetRasterBand(1)
+    aspect_band = out_datasets[1].GetRasterBand(1)
+
+    coverage = _block_coverage(src_ds, block_size)
+    if coverage is not None:
+        logger.info(f"Skipping {coverage.size - int(coverage.sum())} of {coverage.size} empty blocks")
+
+    # Output tiles reused across blocks (edge blocks use a view)
+    slope_buffer = np.empty((block_size, block_size), dtype=SLOPE_ENCODING[1])
+    aspect_buffer = np.empty((block_size, block_size), dtype=ASPECT_ENCODING[1])
+
+    for yoff in range(0, height, block_size):
+        ysize = min(block_size, height - yoff)
+        for xoff in range(0, width, block_size):
+            xsize = min(block_size, width - xoff)
+
+            # All-nodata blocks stay unwritten (SPARSE_OK)
+            if coverage is not None and not coverage[yoff // block_size, xoff // block_size]:
+                continue
+
+            # Read the block plus its halo, clipped to the raster
+            x0, y0 = max(xoff - 1, 0), max(yoff - 1, 0)
+            x1, y1 = min(xoff + xsize + 1, width), min(yoff + ysize + 1, height)
+            dem = src_band.ReadAsArray(x0, y0, x1 - x0, y1 - y0).astype(np.float64)
+            if nodata is not None:
+                dem[dem == nodata] = np.nan
+            dem = np.pad(
+                dem,
+                ((1 - (yoff - y0), 1 - (y1 - yoff - ysize)),
+                 (1 - (xoff - x0), 1 - (x1 - xoff - xsize))),
+                mode='edge'
+            )
+
+            slope = slope_buffer[:ysize, :xsize]
+            aspect = aspect_buffer[:ysize, :xsize]
+            slope_aspect_tile(
+                dem, x_res_rows[yoff:yoff + ysize], y_res,
+                SLOPE_ENCODING[2], ASPECT_ENCODING[2],
+                SLOPE_ENCODING[3], ASPECT_ENCODING[3],
+                slope, aspect
+            )
+
+            slope_band.WriteArray(slope, xoff, yoff)
+            aspect_band.WriteArray(aspect, xoff, yoff)
+
+    out_datasets = slope_band = aspect_band = None
+    src_ds = None
 
     logger.info(f"Slope raster saved to {output_slope}")
+    logger.info(f"Aspect raster saved to {output_aspect}")
 
 
-def calculate_aspect(input_dem: Path, output_aspect: Path):
+def _slope_aspect_chunk(
+    z: np.ndarray,
+    x_res_rows: np.ndarray,
+    y_res: float,
+    block_info: Optional[dict] = None
+) -> np.ndarray:
     """
-    Calculate aspect in degrees from DEM.
+    Quantized slope and aspect of one dask chunk that carries a 1-pixel halo.
+
+    Returns:
+        Array of shape (2, rows, cols) holding slope and aspect
+    """
+    rows, cols = z.shape[0] - 2, z.shape[1] - 2
+    row_start = block_info[None]['array-location'][1][0]
+
+    # Both products share the wider aspect type; slope is narrowed on write
+    out = np.empty((2, rows, cols), dtype=ASPECT_ENCODING[1])
+    slope_aspect_tile(
+        z.astype(np.float64, copy=False), x_res_rows[row_start:row_start + rows], y_res,
+        SLOPE_ENCODING[2], ASPECT_ENCODING[2],
+        SLOPE_ENCODING[3], ASPECT_ENCODING[3],
+        out[0], out[1]
+    )
+    return out
+
+
+def calculate_slope_and_aspect_dask(
+    input_dem: Path,
+    output_slope: Path,
+    output_aspect: Path,
+    chunk_size: int = 2048
+):
+    """
+    Calculate slope and aspect lazily over dask chunks, for DEMs larger than RAM.
+
+    Same products as calculate_slope_and_aspect: the DEM is read in chunks
+    with a 1-pixel halo (edge values repeated at the border) and both
+    outputs are written from a single pass over it.
 
     Args:
         input_dem: Input DEM
+        output_slope: Output slope raster
         output_aspect: Output aspect raster
+        chunk_size: Chunk size in pixels
     """
-    logger.info(f"Calculating aspect...")
+    if rioxarray is None:
+        raise RuntimeError("The dask engine requires the dask and rioxarray packages")
+
+    logger.info("Calculating slope and aspect with dask...")
 
-    gdal.DEMProcessing(
-        str(output_aspect),
+    dem = rioxarray.open_rasterio(
         str(input_dem),
-        'aspect',
-        computeEdges=True,
-        zeroForFlat=True
+        chunks={'band': 1, 'y': chunk_size, 'x': chunk_size},
+        masked=True,  # nodata as NaN
+        lock=False
+    ).squeeze('band', drop=True)
+    x_res_rows, y_res = _row_pixel_sizes(gdal.Open(str(input_dem)))
+
+    haloed = dask.array.overlap.overlap(dem.data, depth=1, boundary='nearest')
+    products = haloed.map_blocks(
+        _slope_aspect_chunk,
+        x_res_rows,
+        y_res,
+        new_axis=0,
+        chunks=((2,), *dem.data.chunks),
+        dtype=ASPECT_ENCODING[1]
     )
 
+    lock = threading.Lock()
+    writes = []
+    for index, path, (_, np_type, _, out_nodata) in (
+        (0, output_slope, SLOPE_ENCODING),
+        (1, output_aspect, ASPECT_ENCODING)
+    ):
+        band = dem.copy(data=products[index].astype(np_type))
+        band.attrs = {}
+        band.encoding = {}  # Drop the DEM's nodata encoding
+        band = band.rio.write_nodata(out_nodata)
+        writes.append(band.rio.to_raster(
+            str(path),
+            tiled=True,
+            blockxsize=512,
+            blockysize=512,
+            compress='ZSTD',
+            zstd_level=1,
+            predictor=PREDICTOR_INTEGER,
+            num_threads='ALL_CPUS',
+            sparse_ok=True,
+            lock=lock,
+            compute=False
+        ))
+    # One compute, so both outputs share each chunk's read and kernel run
+    dask.compute(*writes)
+
+    for path, (_, _, scale, _) in ((output_slope, SLOPE_ENCODING), (output_aspect, ASPECT_ENCODING)):
+        out_ds = gdal.Open(str(path), gdal.GA_Update)
+        out_ds.GetRasterBand(1).SetScale(scale)
+        out_ds.GetRasterBand(1).SetOffset(0.0)
+        out_ds = None
+
+    logger.info(f"Slope raster saved to {output_slope}")
     logger.info(f"Aspect raster saved to {output_aspect}")
 
 
+def _fits_in_memory(ds: gdal.Dataset) -> bool:
+    """Check whether the in-memory pipeline can hold a DEM of this grid."""
+    band = ds.GetRasterBand(1)
+    dem_bytes = ds.RasterXSize * ds.RasterYSize * gdal.GetDataTypeSize(band.DataType) // 8
+    ram_bytes = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    return dem_bytes * MEM_PIPELINE_OVERHEAD <= ram_bytes * MEM_PIPELINE_RAM_FRACTION
+
+
 def process_dem_pipeline(
     input_dir: Path,
     output_dir: Path,
     target_crs: str = 'EPSG:4326',
-    resolution: int = 90
+    resolution: int = 90,
+    aoi_bounds: Optional[Tuple[float, float, float, float]] = None,
+    engine: str = 'gdal'
 ):
     """
     Complete DEM processing pipeline.
 
+    With the default 'gdal' engine, the DEM is warped, void-filled and turned
+    into slope/aspect in memory, writing it to disk only once. DEMs too
+    large for that are handed to process_dem_tiled. The opt-in 'dask' engine
+    instead warps and fills on disk and derives slope/aspect lazily in chunks.
+
     Args:
         input_dir: Directory containing source DEM tiles
         output_dir: Output directory for processed products
         target_crs: Target coordinate reference system
         resolution: Output resolution in meters
+        aoi_bounds: Optional (minx, miny, maxx, maxy) in the tiles' CRS to
+            restrict processing to
+        engine: 'gdal' or 'dask'
     """
+    if engine not in ('gdal', 'dask'):
+        raise ValueError(f"Unknown DEM engine: {engine}")
+
     logger.info("Starting DEM processing pipeline")
 
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Step 1: Mosaic tiles
-    vrt_path = output_dir / 'dem_mosaic.vrt'
-    mosaic_dem_tiles(input_dir, vrt_path)
+    with gdal.config_options(GDAL_CONFIG_OPTIONS):
+        # Step 1: Mosaic tiles
+        vrt_path = output_dir / 'dem_mosaic.vrt'
+        mosaic_dem_tiles(input_dir, vrt_path, aoi_bounds)
 
-    # Step 2: Reproject and fill
-    dem_path = output_dir / 'dem.tif'
-    logger.info(f"Reprojecting DEM to {target_crs}...")
-
-    gdal.Warp(
-        str(dem_path),
-        str(vrt_path),
-        dstSRS=target_crs,
-        xRes=resolution,
-        yRes=resolution,
-        resampleAlg='bilinear',
-        creationOptions=[
-            'TILED=YES',
-            'COMPRESS=DEFLATE',
-            'BLOCKSIZE=512'
-        ]
-    )
+        # Resolve the target grid without warping any pixels
+        grid_ds = gdal.Warp('', str(vrt_path), format='VRT', dstSRS=target_crs,
+                            xRes=resolution, yRes=resolution)
+        in_memory = _fits_in_memory(grid_ds)
+        grid_ds = None
 
-    # Step 3: Calculate slope
-    slope_path = output_dir / 'slope.tif'
-    calculate_slope(dem_path, slope_path)
+    if engine == 'dask':
+        return _process_dem_dask(vrt_path, output_dir, target_crs, resolution)
+
+    if not in_memory:
+        logger.info("DEM does not fit in memory, processing it tile by tile")
+        return process_dem_tiled(input_dir, output_dir, target_crs, resolution, aoi_bounds)
+
+    with gdal.config_options(GDAL_CONFIG_OPTIONS):
+        # Step 2: Reproject and fill in memory
+        dem_path = output_dir / 'dem.tif'
+        logger.info(f"Reprojecting DEM to {target_crs}...")
+
+        mem_ds = gdal.Warp(
+            '',
+            str(vrt_path),
+            format='MEM',
+            dstSRS=target_crs,
+            xRes=resolution,
+            yRes=resolution,
+            resampleAlg=DEM_RESAMPLING,
+            multithread=True,  # Overlap source I/O with warping
+            warpOptions=['NUM_THREADS=ALL_CPUS']  # Parallel resampling
+        )
+
+        logger.info("Filling DEM voids...")
+        fill_band_voids(mem_ds.GetRasterBand(1))
+
+        gdal.Translate(
+            str(dem_path),
+            mem_ds,
+            format='COG',  # Tiled with overviews, written in one pass
+            creationOptions=cog_creation_options()
+        )
 
-    # Step 4: Calculate aspect
+        # Step 3: Calculate slope and aspect in one pass over the in-memory DEM
+        slope_path = output_dir / 'slope.tif'
+        aspect_path = output_dir / 'aspect.tif'
+        calculate_slope_and_aspect(mem_ds, slope_path, aspect_path)
+        mem_ds = None
+
+    logger.info("DEM processing pipeline complete")
+
+    return {
+        'dem': dem_path,
+        'slope': slope_path,
+        'aspect': aspect_path
+    }
+
+
+def _process_dem_dask(vrt_path: Path, output_dir: Path, target_crs: str, resolution: int) -> dict:
+    """Warp and fill the mosaic on disk, then derive slope/aspect with dask."""
+    dem_path = output_dir / 'dem.tif'
+    raw_path = output_dir / 'dem_raw.tif'
+    filled_path = output_dir / 'dem_filled.tif'
+    slope_path = output_dir / 'slope.tif'
     aspect_path = output_dir / 'aspect.tif'
-    calculate_aspect(dem_path, aspect_path)
+
+    with gdal.config_options(GDAL_CONFIG_OPTIONS):
+        logger.info(f"Reprojecting DEM to {target_crs}...")
+        gdal.Warp(
+            str(raw_path),
+            str(vrt_path),
+            format='GTiff',
+            dstSRS=target_crs,
+            xRes=resolution,
+            yRes=resolution,
+            resampleAlg=DEM_RESAMPLING,
+            multithread=True,
+            warpOptions=['NUM_THREADS=ALL_CPUS'],
+            creationOptions=gtiff_creation_options(PREDICTOR_INTEGER)
+        )
+        fill_dem_voids(raw_path, filled_path)
+        raw_path.unlink()
+
+        gdal.Translate(
+            str(dem_path),
+            str(filled_path),
+            format='COG',
+            creationOptions=cog_creation_options()
+        )
+
+    calculate_slope_and_aspect_dask(filled_path, slope_path, aspect_path)
+    filled_path.unlink()
 
     logger.info("DEM processing pipeline complete")
 
@@ -174,22 +810,262 @@ def process_dem_pipeline(
     }
 
 
+def generate_tiling_grid(width: int, height: int, tile_size: int, overlap: int) -> list:
+    """
+    Split a raster grid into square tiles with an overlapping halo.
+
+    Args:
+        width: Grid width in pixels
+        height: Grid height in pixels
+        tile_size: Tile size in pixels, excluding the halo
+        overlap: Halo width in pixels on each side, clipped at the grid edge
+
+    Returns:
+        List of (window, halo window) pairs of (xoff, yoff, xsize, ysize)
+    """
+    tiles = []
+    for yoff in range(0, height, tile_size):
+        ysize = min(tile_size, height - yoff)
+        for xoff in range(0, width, tile_size):
+            xsize = min(tile_size, width - xoff)
+            hx, hy = max(xoff - overlap, 0), max(yoff - overlap, 0)
+            hx_end = min(xoff + xsize + overlap, width)
+            hy_end = min(yoff + ysize + overlap, height)
+            tiles.append(((xoff, yoff, xsize, ysize), (hx, hy, hx_end - hx, hy_end - hy)))
+    return tiles
+
+
+def _process_dem_tile(task: dict) -> dict:
+    """
+    Warp, fill and derive slope/aspect for one tile of the target grid.
+
+    Runs in a worker process. The tile is processed with its halo, which is
+    stripped from the outputs so neighbouring tiles stitch without seams.
+
+    Args:
+        task: Tile description built by process_dem_tiled
+
+    Returns:
+        Dict of product name to the tile's output path
+    """
+    tile_dir = Path(task['tile_dir'])
+    index = task['index']
+    xoff, yoff, xsize, ysize = task['window']
+    hx, hy, hxsize, hysize = task['halo_window']
+    x0, xres, _, y0, _, yres = task['geotransform']
+
+    raw_path = tile_dir / f'raw_{index}.tif'
+    halo_paths = {name: tile_dir / f'{name}_halo_{index}.tif' for name in ('dem', 'slope', 'aspect')}
+
+    with gdal.config_options(task['config_options']):
+        minx = x0 + hx * xres
+        maxy = y0 + hy * yres
+        gdal.Warp(
+            str(raw_path),
+            task['vrt_path'],
+            format='GTiff',
+            dstSRS=task['target_crs'],
+            outputBounds=(minx, maxy + hysize * yres, minx + hxsize * xres, maxy),
+            width=hxsize,
+            height=hysize,
+            resampleAlg=DEM_RESAMPLING,
+            creationOptions=gtiff_creation_options(PREDICTOR_INTEGER)
+        )
+        fill_dem_voids(raw_path, halo_paths['dem'])
+        calculate_slope_and_aspect(halo_paths['dem'], halo_paths['slope'], halo_paths['aspect'])
+
+        outputs = {}
+        for name, halo_path in halo_paths.items():
+            outputs[name] = tile_dir / f'{name}_{index}.tif'
+            gdal.Translate(
+                str(outputs[name]),
+                str(halo_path),
+                srcWin=[xoff - hx, yoff - hy, xsize, ysize],
+                creationOptions=gtiff_creation_options(PREDICTOR_INTEGER)
+            )
+
+    for path in (raw_path, *halo_paths.values()):
+        path.unlink()
+
+    return {name: str(path) for name, path in outputs.items()}
+
+
+def process_dem_tiled(
+    input_dir: Path,
+    output_dir: Path,
+    target_crs: str = 'EPSG:4326',
+    resolution: int = 90,
+    aoi_bounds: Optional[Tuple[float, float, float, float]] = None,
+    tile_size: int = 4096,
+    overlap: int = MIN_TILE_OVERLAP,
+    workers: Optional[int] = None
+):
+    """
+    DEM processing pipeline parallelized over spatial tiles.
+
+    The target grid is split into overlapping tiles that are warped, filled
+    and turned into slope/aspect independently in a process pool, then
+    stitched into COGs. The halo is at least MIN_TILE_OVERLAP, so void
+    filling sees the same neighbourhood as in process_dem_pipeline and
+    tiles stitch without seams.
+
+    Args:
+        input_dir: Directory containing source DEM tiles
+        output_dir: Output directory for processed products
+        target_crs: Target coordinate reference system
+        resolution: Output resolution in meters
+        aoi_bounds: Optional (minx, miny, maxx, maxy) in the tiles' CRS to
+            restrict processing to
+        tile_size: Tile size in pixels, excluding the halo
+        overlap: Halo width in pixels; raised to MIN_TILE_OVERLAP if smaller
+        workers: Worker processes (default: CPU count)
+    """
+    logger.info("Starting tiled DEM processing pipeline")
+
+    workers = workers or os.cpu_count()
+    overlap = max(overlap, MIN_TILE_OVERLAP)
+    output_dir = Path(output_dir)
+    tile_dir = output_dir / 'dem_tiles'
+    tile_dir.mkdir(parents=True, exist_ok=True)
+
+    with gdal.config_options(GDAL_CONFIG_OPTIONS):
+        vrt_path = output_dir / 'dem_mosaic.vrt'
+        mosaic_dem_tiles(input_dir, vrt_path, aoi_bounds)
+
+        # Resolve the target grid without warping any pixels
+        grid_ds = gdal.Warp('', str(vrt_path), format='VRT', dstSRS=target_crs,
+                            xRes=resolution, yRes=resolution)
+        geotransform = grid_ds.GetGeoTransform()
+        width, height = grid_ds.RasterXSize, grid_ds.RasterYSize
+        grid_ds = None
+
+    # Workers run single-threaded GDAL and split the block cache between them
+    worker_options = {
+        **GDAL_CONFIG_OPTIONS,
+        'GDAL_CACHEMAX': f'{max(50 // workers, 1)}%',
+        'GDAL_NUM_THREADS': '1'
+    }
+    tasks = [
+        {
+            'index': index,
+            'window': window,
+            'halo_window': halo_window,
+            'geotransform': geotransform,
+            'target_crs': target_crs,
+            'vrt_path': str(vrt_path),
+            'tile_dir': str(tile_dir),
+            'config_options': worker_options
+        }
+        for index, (window, halo_window) in enumerate(
+            generate_tiling_grid(width, height, tile_size, overlap)
+        )
+    ]
+    logger.info(f"Processing {len(tasks)} tiles with {workers} workers")
+
+    # Spawn rather than fork, so workers don't inherit GDAL state from this process
+    with multiprocessing.get_context('spawn').Pool(workers) as pool:
+        results = pool.map(_process_dem_tile, tasks, chunksize=1)
+
+    # Band scales of the quantized products, restated on the stitched COGs
+    scales = {'slope': SLOPE_ENCODING[2], 'aspect': ASPECT_ENCODING[2]}
+
+    products = {}
+    with gdal.config_options(GDAL_CONFIG_OPTIONS):
+        for name in ('dem', 'slope', 'aspect'):
+            products[name] = output_dir / f'{name}.tif'
+            stitched_vrt = tile_dir / f'{name}.vrt'
+            gdal.BuildVRT(str(stitched_vrt), [result[name] for result in results])
+            gdal.Translate(
+                str(products[name]),
+                str(stitched_vrt),
+                options=['-a_scale', str(scales[name])] if name in scales else [],
+                format='COG',
+                creationOptions=cog_creation_options()
+            )
+
+    shutil.rmtree(tile_dir)
+
+    logger.info("Tiled DEM processing pipeline complete")
+
+    return products
+
+
+def run_worker(jobs=sys.stdin, results=sys.stdout):
+    """
+    Process DEM jobs read as JSON lines, in one long-lived process.
+
+    Each line holds process_dem_pipeline keyword arguments (input_dir,
+    output_dir and optionally target_crs, resolution, aoi_bounds). One JSON
+    line is written back per job, {"status": "ok", "outputs": {...}} or
+    {"status": "error", "error": "..."}, so a driver can keep a pool of
+    workers busy without paying interpreter and GDAL startup per job.
+
+    Args:
+        jobs: Text stream of job lines
+        results: Text stream for result lines
+    """
+    for line in jobs:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+            job['input_dir'] = Path(job['input_dir'])
+            job['output_dir'] = Path(job['output_dir'])
+            if job.get('aoi_bounds') is not None:
+                job['aoi_bounds'] = tuple(job['aoi_bounds'])
+            outputs = process_dem_pipeline(**job)
+            result = {'status': 'ok', 'outputs': {name: str(path) for name, path in outputs.items()}}
+        except Exception as e:
+            logger.exception(f"DEM job failed: {line.strip()}")
+            result = {'status': 'error', 'error': str(e)}
+        results.write(json.dumps(result) + '\n')
+        results.flush()
+
+
 if __name__ == '__main__':
     import argparse
 
     parser = argparse.ArgumentParser(description='Process DEM data')
-    parser.add_argument('--input', required=True, help='Input directory with DEM tiles')
-    parser.add_argument('--output', required=True, help='Output directory')
+    parser.add_argument('--input', help='Input directory with DEM tiles')
+    parser.add_argument('--output', help='Output directory')
     parser.add_argument('--crs', default='EPSG:4326', help='Target CRS')
     parser.add_argument('--resolution', type=int, default=90, help='Resolution in meters')
+    parser.add_argument('--bounds', type=float, nargs=4, metavar=('MINX', 'MINY', 'MAXX', 'MAXY'),
+                        help='Only process tiles intersecting this bounding box')
+    parser.add_argument('--tiled', action='store_true', help='Process spatial tiles in parallel')
+    parser.add_argument('--engine', choices=['gdal', 'dask'], default='gdal',
+                        help='Slope/aspect engine for the non-tiled pipeline')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for --tiled')
+    parser.add_argument('--worker', action='store_true',
+                        help='Read JSON job lines from stdin and write one JSON result line per job')
 
     args = parser.parse_args()
+    if not args.worker and not (args.input and args.output):
+        parser.error('--input and --output are required unless --worker is set')
 
-    logging.basicConfig(level=logging.INFO)
+    logging.basicConfig(level=logging.INFO)  # stderr, keeping stdout for worker results
 
-    process_dem_pipeline(
-        Path(args.input),
-        Path(args.output),
-        args.crs,
-        args.resolution
-    )
+    if args.worker:
+        run_worker()
+        sys.exit(0)
+
+    aoi_bounds = tuple(args.bounds) if args.bounds else None
+
+    if args.tiled:
+        process_dem_tiled(
+            Path(args.input),
+            Path(args.output),
+            args.crs,
+            args.resolution,
+            aoi_bounds,
+            workers=args.workers
+        )
+    else:
+        process_dem_pipeline(
+            Path(args.input),
+            Path(args.output),
+            args.crs,
+            args.resolution,
+            aoi_bounds,
+            engine=args.engine
+        )
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Make the processing package importable as it is when run from data-pipeline/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
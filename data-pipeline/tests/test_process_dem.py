@@ -0,0 +1,58 @@
+"""Tests for the DEM mosaic step."""
+
+import shutil
+
+import pytest
+
+gdal = pytest.importorskip('osgeo.gdal')
+process_dem = pytest.importorskip('processing.process_dem')
+
+
+def _write_tiles(tile_dir, count=3, size=10):
+    """Write count adjacent 1x1 degree Int16 GeoTIFF tiles in a row."""
+    tile_dir.mkdir()
+    driver = gdal.GetDriverByName('GTiff')
+    for i in range(count):
+        ds = driver.Create(str(tile_dir / f'tile_{i}.tif'), size, size, 1, gdal.GDT_Int16)
+        ds.SetGeoTransform((10.0 + i, 1.0 / size, 0.0, 46.0, 0.0, -1.0 / size))
+        ds.SetProjection('EPSG:4326')
+        ds.GetRasterBand(1).Fill(100 * (i + 1))
+        ds = None
+
+
+@pytest.mark.parametrize('threshold', [1000, 1])
+def test_mosaic_dem_tiles_list_and_file_list(tmp_path, monkeypatch, threshold):
+    if threshold < 3 and shutil.which('gdalbuildvrt') is None:
+        pytest.skip('gdalbuildvrt program not available')
+    monkeypatch.setattr(process_dem, 'FILE_LIST_THRESHOLD', threshold)
+    _write_tiles(tmp_path / 'tiles')
+    output_vrt = tmp_path / 'dem.vrt'
+
+    process_dem.mosaic_dem_tiles(tmp_path / 'tiles', output_vrt)
+
+    ds = gdal.Open(str(output_vrt))
+    assert (ds.RasterXSize, ds.RasterYSize) == (30, 10)
+    assert ds.GetRasterBand(1).ReadAsArray()[0].tolist() == [100] * 10 + [200] * 10 + [300] * 10
+    assert not list((tmp_path / process_dem.MOSAIC_CACHE_DIR).glob('*.tiles.txt'))
+
+
+def test_mosaic_cache_keeps_other_aois_and_prunes_changed_tiles(tmp_path):
+    _write_tiles(tmp_path / 'tiles')
+    output_vrt = tmp_path / 'dem.vrt'
+    cache_dir = tmp_path / process_dem.MOSAIC_CACHE_DIR
+
+    process_dem.mosaic_dem_tiles(tmp_path / 'tiles', output_vrt, (10.2, 45.2, 10.8, 45.8))
+    process_dem.mosaic_dem_tiles(tmp_path / 'tiles', output_vrt, (11.2, 45.2, 11.8, 45.8))
+    assert len(list(cache_dir.glob('dem.*.vrt'))) == 2
+
+    # Back to the first AOI: served from the cache, not rebuilt
+    first_aoi = min(cache_dir.glob('dem.*.vrt'), key=lambda p: p.stat().st_mtime_ns)
+    mtime = first_aoi.stat().st_mtime_ns
+    process_dem.mosaic_dem_tiles(tmp_path / 'tiles', output_vrt, (10.2, 45.2, 10.8, 45.8))
+    assert first_aoi.stat().st_mtime_ns == mtime
+    assert len(list(cache_dir.glob('dem.*.vrt'))) == 2
+
+    # A changed tile set invalidates every AOI's cached VRT
+    shutil.copyfile(tmp_path / 'tiles' / 'tile_0.tif', tmp_path / 'tiles' / 'tile_3.tif')
+    process_dem.mosaic_dem_tiles(tmp_path / 'tiles', output_vrt, (10.2, 45.2, 10.8, 45.8))
+    assert len(list(cache_dir.glob('dem.*.vrt'))) == 1